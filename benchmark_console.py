@@ -0,0 +1,226 @@
+"""Benchmarks for the hot paths of python_linux_management_console.py.
+
+Builds a farm of fake python3.X interpreters (shell stubs on a temporary PATH
+that answer --version, the package/module probes and pip queries after a
+configurable delay) and synthetic python_linux_versions/ log corpora, then
+times interpreter discovery, module search, log listing, log search and
+log_action throughput as N grows. Results are written as JSON.
+
+    python3 benchmark_console.py --interpreters 4 16 64 --log-records 1000 100000
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+STUB_TEMPLATE = """#!/bin/sh
+# Fake interpreter generated by benchmark_console.py
+sleep {latency}
+case "$1" in
+    --version) echo "Python {version}" ;;
+    -c)
+        case "$2" in
+            *pkgutil*) cat "{modules_file}" ;;
+            *) cat "{packages_file}" ;;
+        esac ;;
+    -m)
+        case "$3 $4" in
+            "index versions") echo "$5 (1.0.0)"; echo "Available versions: 1.0.0, 0.9.0" ;;
+            "show "*) grep -q "\\"name\\": \\"$4\\"" "{packages_file}" && echo "Name: $4" || exit 1 ;;
+            *) cat "{packages_file}" ;;
+        esac ;;
+esac
+"""
+
+ACTIONS = [
+    "list_python_versions", "install_module", "uninstall_module", "search_module",
+    "list_installed_packages", "generate_requirements", "install_python_version", "view_logs",
+]
+
+
+def build_interpreter_farm(root, count, packages_per_interpreter, latency, rng):
+    """Create `count` fake python3.X stubs in root/bin and return that directory."""
+    bin_dir = root / "bin"
+    data_dir = root / "data"
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    data_dir.mkdir(exist_ok=True)
+    for i in range(count):
+        minor = 100 + i
+        packages = [
+            {"name": f"pkg{n}", "version": f"{rng.randint(0, 9)}.{rng.randint(0, 30)}.0",
+             "location": f"/opt/fake/python3.{minor}/site-packages", "requires": [], "installer": "pip"}
+            for n in rng.sample(range(packages_per_interpreter * 4), packages_per_interpreter)
+        ]
+        modules = {"path": [], "modules": [
+            {"name": p["name"], "package": True, "origin": "site-packages", "extension": False} for p in packages
+        ]}
+        packages_file = data_dir / f"packages_3.{minor}.json"
+        modules_file = data_dir / f"modules_3.{minor}.json"
+        packages_file.write_text(json.dumps(packages))
+        modules_file.write_text(json.dumps(modules))
+        stub = bin_dir / f"python3.{minor}"
+        stub.write_text(STUB_TEMPLATE.format(
+            latency=latency, version=f"3.{minor}.0",
+            packages_file=packages_file, modules_file=modules_file,
+        ))
+        stub.chmod(0o755)
+    return bin_dir
+
+
+def build_tools_dir(root):
+    """Directory holding only the tools the stubs need, so real interpreters stay off PATH."""
+    tools = root / "tools"
+    tools.mkdir(parents=True, exist_ok=True)
+    for tool in ("sh", "sleep", "cat", "grep"):
+        link = tools / tool
+        if not link.exists():
+            link.symlink_to(shutil.which(tool))
+    return tools
+
+
+def build_log_corpus(log_dir, records, legacy_files, segment_bytes, rng):
+    """Write `records` JSON-lines log records into segment files plus `legacy_files` old-style logs."""
+    segments = log_dir / "segments"
+    segments.mkdir(parents=True, exist_ok=True)
+    start = datetime.datetime(2024, 1, 1)
+    number = 1
+    out = open(segments / f"segment_{number:06d}.jsonl", "w")
+    written = 0
+    for i in range(records):
+        action = rng.choice(ACTIONS)
+        status = 1 if rng.random() < 0.05 else 0
+        record = {
+            "timestamp": (start + datetime.timedelta(seconds=i * 30)).strftime("%Y-%m-%d %H:%M:%S"),
+            "action": action,
+            "message": f"{action} for Python 3.{rng.randint(6, 13)}",
+            "output": "ERROR: pip install failed" if status else f"Successfully installed pkg{rng.randint(0, 500)}",
+            "duration": round(rng.random() * 5, 3),
+            "status": status,
+        }
+        line = json.dumps(record) + "\n"
+        if written + len(line) > segment_bytes:
+            out.close()
+            number += 1
+            out = open(segments / f"segment_{number:06d}.jsonl", "w")
+            written = 0
+        out.write(line)
+        written += len(line)
+    out.close()
+    for i in range(legacy_files):
+        stamp = start + datetime.timedelta(minutes=i)
+        action = rng.choice(ACTIONS)
+        name = log_dir / f"{action}_{stamp.strftime('%Y%m%d_%H_%M_%S')}.log"
+        name.write_text(f"[{stamp.strftime('%Y-%m-%d %H:%M:%S')}] {action}\nlegacy output {i}\n\n")
+
+
+def timed(func, repeat=1):
+    """Return the best wall time of `repeat` runs of func()."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    workdir = Path(tempfile.mkdtemp(prefix="console-bench-"))
+    os.chdir(workdir)
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    import python_linux_management_console as console
+
+    results = []
+    quiet = contextlib.redirect_stdout(io.StringIO())
+
+    def record(benchmark, n, seconds, **extra):
+        results.append({"benchmark": benchmark, "n": n, "seconds": round(seconds, 6), **extra})
+        print(f"{benchmark:<36} n={n:<9} {seconds:9.4f}s {extra if extra else ''}")
+
+    original_path = os.environ["PATH"]
+    tools = build_tools_dir(workdir)
+    for count in args.interpreters:
+        farm = build_interpreter_farm(workdir / f"farm_{count}", count, args.packages, args.latency, rng)
+        os.environ["PATH"] = f"{farm}:{tools}"
+        console.INVENTORY_CACHE = workdir / f"inventory_{count}.json"
+        record("find_installed_python_versions_cold", count, timed(console.find_installed_python_versions))
+        record("find_installed_python_versions_warm", count,
+               timed(console.find_installed_python_versions, args.repeat))
+
+        modules = " ".join(f"pkg{n}" for n in range(args.search_modules))
+        console.input = lambda prompt="": modules
+        with quiet:
+            seconds = timed(console.search_installed_module, args.repeat)
+        del console.input
+        record("search_installed_module", count, seconds, modules=args.search_modules)
+    os.environ["PATH"] = original_path
+
+    for size in args.log_records:
+        log_dir = workdir / f"logs_{size}"
+        build_log_corpus(log_dir, size, args.legacy_files, args.segment_bytes, rng)
+        console.LOG_DIR = log_dir
+        console.LOG_STORE = console.SegmentLogStore(log_dir / "segments", args.segment_bytes)
+        record("log_index_build", size, timed(console.LOG_STORE.actions))
+        with quiet:
+            seconds = timed(console.view_logs, args.repeat)
+        record("view_logs", size, seconds, legacy_files=args.legacy_files)
+        record("search_logs_all", size, timed(lambda: sum(1 for _ in console.search_logs("ERROR: pip")), args.repeat))
+        record("search_logs_action_range", size, timed(
+            lambda: sum(1 for _ in console.search_logs(
+                "failed", action="install_module", since="2024-01-02 00:00:00", until="2024-01-09 23:59:59")),
+            args.repeat))
+        record("search_logs_limit_10", size, timed(lambda: sum(1 for _ in console.search_logs("pkg", limit=10)),
+                                                    args.repeat))
+
+        appends = args.log_appends
+        seconds = timed(lambda: [console.log_action("bench", f"entry {i}", "output line") for i in range(appends)])
+        record("log_action_throughput", appends, seconds, records_per_second=round(appends / seconds))
+        console.LOG_STORE.close()
+
+    report = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "latency": args.latency,
+        "results": results,
+    }
+    output = Path(args.output)
+    if not output.is_absolute():
+        output = Path(args.cwd) / output
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nResults written to {output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--interpreters", type=int, nargs="+", default=[4, 16, 64],
+                        help="sizes of the fake interpreter farm")
+    parser.add_argument("--packages", type=int, default=200, help="packages per fake interpreter")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds each fake interpreter call sleeps")
+    parser.add_argument("--search-modules", type=int, default=5, help="module names per search")
+    parser.add_argument("--log-records", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="sizes of the synthetic log corpus")
+    parser.add_argument("--legacy-files", type=int, default=1000, help="old one-file-per-action logs per corpus")
+    parser.add_argument("--segment-bytes", type=int, default=4 * 1024 * 1024, help="log segment size")
+    parser.add_argument("--log-appends", type=int, default=10000, help="records for the log_action benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per timing; the best is kept")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+    args.cwd = os.getcwd()
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
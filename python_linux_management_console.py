@@ -7,49 +7,1002 @@ import shutil
 from pathlib import Path
 from colorama import Fore, Style, init
 import sys
+import json
+import hashlib
+import threading
+import atexit
+import mmap
+import gzip
+import functools
+import collections
+import asyncio
+import contextlib
+import time
+import socket
+import socketserver
+import select
+import struct
+import signal
+import ctypes
+import ctypes.util
+import fcntl
+import argparse
+import abc
+import statistics
+import tempfile
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait
 
 init(autoreset=True)
 
 LOG_DIR = Path("python_linux_versions")
 LOG_DIR.mkdir(exist_ok=True)
 
-def log_action(log_name, message, output=""):
+CACHE_DIR = LOG_DIR / "cache"
+CACHE_DIR.mkdir(exist_ok=True)
+INVENTORY_CACHE = CACHE_DIR / "python_inventory.json"
+PROBE_WORKERS = 8
+PROBE_TIMEOUT = 10
+
+# Runs inside the target interpreter and dumps its installed distributions
+# as JSON, so one short spawn answers every package question.
+PACKAGE_PROBE = r"""
+import json, sys
+from importlib import metadata
+packages = []
+for dist in metadata.distributions():
+    name = dist.metadata["Name"]
+    if not name:
+        continue
+    try:
+        installer = (dist.read_text("INSTALLER") or "").strip()
+    except Exception:
+        installer = ""
+    try:
+        direct_url = json.loads(dist.read_text("direct_url.json") or "null")
+    except Exception:
+        direct_url = None
+    packages.append({
+        "name": name,
+        "version": dist.version,
+        "location": str(dist.locate_file("")),
+        "requires": dist.requires or [],
+        "installer": installer,
+        "direct_url": direct_url,
+    })
+json.dump(packages, sys.stdout)
+"""
+PACKAGE_PROBE_TIMEOUT = 60
+
+# Lists top-level modules on the interpreter's sys.path with pkgutil, which
+# only looks at file names and never imports anything.
+MODULE_PROBE = r"""
+import json, os, pkgutil, sys, sysconfig
+from importlib.machinery import EXTENSION_SUFFIXES
+paths = sysconfig.get_paths()
+stdlib = [os.path.realpath(paths[k]) for k in ("stdlib", "platstdlib") if k in paths]
+site = {os.path.realpath(paths[k]) for k in ("purelib", "platlib") if k in paths}
+modules = [{"name": n, "package": False, "origin": "builtin", "extension": False}
+           for n in sys.builtin_module_names]
+seen = set(sys.builtin_module_names)
+for entry in sys.path:
+    if not entry or not os.path.isdir(entry):
+        continue
+    real = os.path.realpath(entry)
+    try:
+        files = set(os.listdir(entry))
+    except OSError:
+        continue
+    if real in site or "site-packages" in real or "dist-packages" in real:
+        origin = "site-packages"
+    elif any(real == s or real.startswith(s + os.sep) for s in stdlib):
+        origin = "stdlib"
+    else:
+        origin = "other"
+    for info in pkgutil.iter_modules([entry]):
+        if info.name in seen:
+            continue
+        seen.add(info.name)
+        extension = not info.ispkg and any(info.name + s in files for s in EXTENSION_SUFFIXES)
+        modules.append({"name": info.name, "package": info.ispkg, "origin": origin, "extension": extension})
+json.dump({"path": [p for p in sys.path if p], "modules": modules}, sys.stdout)
+"""
+MODULE_CACHE = CACHE_DIR / "module_inventory.json"
+
+# sys.path and marker environment of an interpreter; the dependency graph is
+# then read from dist-info metadata in-process, without importing anything.
+PATH_PROBE = r"""
+import json, os, platform, sys
+json.dump({
+    "path": [p for p in sys.path if p],
+    "python_version": "%d.%d" % sys.version_info[:2],
+    "python_full_version": platform.python_version(),
+    "implementation_name": sys.implementation.name,
+    "implementation_version": platform.python_version() if sys.implementation.name == "cpython" else
+        "%d.%d.%d" % sys.implementation.version[:3],
+    "platform_python_implementation": platform.python_implementation(),
+    "platform_release": platform.release(),
+    "platform_version": platform.version(),
+    "sys_platform": sys.platform,
+    "platform_system": platform.system(),
+    "platform_machine": platform.machine(),
+    "os_name": os.name,
+}, sys.stdout)
+"""
+DEPENDENCY_CACHE = CACHE_DIR / "dependency_graph.json"
+# Graphs are built in parallel; each read-modify-write of the shared cache holds this
+DEPENDENCY_CACHE_LOCK = threading.Lock()
+SEARCH_TIMEOUT = 20
+
+# Package-manager metadata younger than this is not refreshed before an install
+PACKAGE_METADATA_MAX_AGE = int(os.environ.get("PYTHON_CONSOLE_METADATA_MAX_AGE", 3600))
+# Force a backend (apt, dnf, yum or fake) instead of detecting it from /etc/os-release
+PACKAGE_MANAGER_OVERRIDE = os.environ.get("PYTHON_CONSOLE_PACKAGE_MANAGER")
+
+PYPI_INDEX_CACHE = CACHE_DIR / "pypi_versions.json"
+PYPI_CACHE_TTL = 6 * 3600
+# Local simple-index or wheelhouse directory used instead of pip on air-gapped hosts
+LOCAL_PACKAGE_INDEX = os.environ.get("PYTHON_CONSOLE_PACKAGE_INDEX")
+# Wheels built once per interpreter ABI and reused by "install everywhere"
+WHEELHOUSE_DIR = Path(os.environ.get("PYTHON_CONSOLE_WHEELHOUSE", LOG_DIR / "wheelhouse"))
+ABI_PROBE = "import sys, sysconfig; print(sys.implementation.cache_tag + '-' + sysconfig.get_platform().replace('-', '_').replace('.', '_'))"
+PYPI_REFRESH_WORKERS = 8
+
+# node_exporter textfile collector target for the performance stats, if set
+PROMETHEUS_TEXTFILE = os.environ.get("PYTHON_CONSOLE_PROM_TEXTFILE")
+
+# Roots walked for virtualenvs and conda environments (colon separated)
+ENV_SEARCH_ROOTS = os.environ.get("PYTHON_CONSOLE_ENV_ROOTS", f"{Path.home()}:/opt").split(":")
+ENV_SEARCH_MAX_DEPTH = 6
+# Directory names never descended into, at any depth
+ENV_SKIP_DIRS = {
+    "node_modules", ".git", ".hg", ".svn", "__pycache__", "site-packages", "dist-packages",
+    ".npm", ".cargo", ".rustup", "pkgs",
+}
+# Pseudo filesystems, pruned only at these absolute paths
+ENV_SKIP_PATHS = {"/proc", "/sys", "/dev"}
+ENV_CACHE = CACHE_DIR / "environments.json"
+ENV_SCAN_WORKERS = 16
+
+# Disk usage analyzer: file hashes are cached by inode and mtime
+FILE_HASH_CACHE = CACHE_DIR / "file_hashes.json"
+DEDUP_DIR = LOG_DIR / "dedup"
+DEDUP_MIN_BYTES = 4096
+DISK_SCAN_WORKERS = 16
+
+# Stored -X importtime profiles
+IMPORTTIME_DIR = LOG_DIR / "importtime"
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+IMPORTTIME_TIMEOUT = 120
+
+SNAPSHOT_DIR = LOG_DIR / "snapshots"
+SNAPSHOT_INDEX = SNAPSHOT_DIR / "index.json"
+# pip freeze leaves these out of requirements files by default,
+FREEZE_EXCLUDES = {"pip"}
+# and these too on interpreters older than 3.12
+FREEZE_BUILD_BACKENDS = {"setuptools", "wheel", "distribute"}
+
+LOG_STORE_DIR = LOG_DIR / "segments"
+LOG_INDEX_FILE = LOG_STORE_DIR / "index.json"
+SEGMENT_MAX_BYTES = 4 * 1024 * 1024
+# Streaming commands keep only this many trailing lines in memory
+COMMAND_TAIL_LINES = 200
+# and hand their output to the log in chunks of about this size
+COMMAND_LOG_CHUNK_BYTES = 256 * 1024
+ARCHIVE_DIR = LOG_DIR / "archives"
+ARCHIVE_MANIFEST = ARCHIVE_DIR / "manifest.json"
+# Retention defaults for "Compact and prune logs"; unset means keep everything
+LOG_RETENTION_DAYS = os.environ.get("PYTHON_CONSOLE_LOG_RETENTION_DAYS")
+LOG_RETENTION_MAX_MB = os.environ.get("PYTHON_CONSOLE_LOG_RETENTION_MAX_MB")
+LOG_SEARCH_PROCESS_THRESHOLD = 8
+LOG_SEARCH_CONTEXT = 1
+
+# Resident daemon: keeps inventory, package metadata and the log index warm
+DAEMON_SOCKET = Path(os.environ.get("PYTHON_CONSOLE_SOCKET", LOG_DIR / "console.sock"))
+DAEMON_CLIENT_TIMEOUT = 2
+# Seconds between mtime polls when inotify is not available
+DAEMON_POLL_INTERVAL = 2
+# Changes arriving this close together are handled as one refresh
+DAEMON_DEBOUNCE = 0.3
+
+
+class SegmentLogStore:
+    """Append-only JSON-lines log split into size-rotated segment files.
+
+    A sidecar index maps each segment to its byte size, time range and
+    per-action counts, so listing history never scans the records.
+    Several console processes may share one store: segments are opened in
+    append mode and every append holds an flock on the store's lock file.
+    """
+
+    def __init__(self, store_dir, max_bytes=SEGMENT_MAX_BYTES):
+        self.store_dir = Path(store_dir)
+        self.index_file = self.store_dir / "index.json"
+        self.lock_path = self.store_dir / ".lock"
+        self.max_bytes = max_bytes
+        self.lock = threading.RLock()
+        self.index = None
+        self.writer = None
+        self.writer_name = None
+
+    @contextlib.contextmanager
+    def _process_lock(self):
+        """Exclusive lock shared with other processes appending to this store."""
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _segment_path(self, name):
+        return self.store_dir / name
+
+    def _load(self):
+        if self.index is not None:
+            return
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        index = load_json_cache(self.index_file, {})
+        segments = index.get("segments", {})
+        on_disk = sorted(p.name for p in self.store_dir.glob("segment_*.jsonl"))
+        segments = {name: segments[name] for name in on_disk if name in segments}
+        # The index is saved lazily, so fold in any bytes written after it
+        for name in on_disk:
+            entry = segments.setdefault(name, self._empty_entry())
+            size = self._segment_path(name).stat().st_size
+            if size != entry["bytes"]:
+                if size < entry["bytes"]:
+                    entry = segments[name] = self._empty_entry()
+                self._scan_segment(name, entry)
+        self.index = {"segments": segments, "current": on_disk[-1] if on_disk else None}
+
+    @staticmethod
+    def _empty_entry():
+        return {"bytes": 0, "records": 0, "first": None, "last": None, "actions": {}}
+
+    @staticmethod
+    def _account(entry, record, nbytes):
+        entry["bytes"] += nbytes
+        entry["records"] += 1
+        ts = record["timestamp"]
+        entry["first"] = entry["first"] or ts
+        entry["last"] = ts
+        action = entry["actions"].setdefault(record["action"], {"count": 0, "first": ts, "last": ts})
+        action["count"] += 1
+        action["last"] = ts
+
+    def _scan_segment(self, name, entry):
+        with open(self._segment_path(name), "rb") as f:
+            f.seek(entry["bytes"])
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # torn write at the tail; the next append terminates it
+                try:
+                    record = json.loads(raw)
+                except ValueError:
+                    entry["bytes"] += len(raw)
+                    continue
+                self._account(entry, record, len(raw))
+
+    def _open_writer(self, name):
+        if self.writer_name == name:
+            return
+        if self.writer:
+            self.writer.close()
+        self.writer = open(self._segment_path(name), "ab")
+        self.writer_name = name
+        self.index["current"] = name
+
+    @staticmethod
+    def _segment_number(name):
+        return int(name.split("_")[1].split(".")[0])
+
+    def _catch_up(self):
+        """Fold in segments and records written by other processes; return the newest segment name."""
+        current = self.index["current"]
+        if current is None:
+            on_disk = sorted(p.name for p in self.store_dir.glob("segment_*.jsonl"))
+            if not on_disk:
+                return None
+            current = on_disk[-1]
+        while True:
+            entry = self.index["segments"].setdefault(current, self._empty_entry())
+            path = self._segment_path(current)
+            size = path.stat().st_size if path.exists() else 0
+            if size and size != entry["bytes"]:
+                with open(path, "rb") as f:
+                    f.seek(size - 1)
+                    torn = f.read(1) != b"\n"
+                if torn:
+                    # A writer died mid-line; end that line so ours starts clean
+                    with open(path, "ab") as f:
+                        f.write(b"\n")
+                self._scan_segment(current, entry)
+            following = f"segment_{self._segment_number(current) + 1:06d}.jsonl"
+            if not self._segment_path(following).exists():
+                break
+            current = following
+        self.index["current"] = current
+        return current
+
+    def append(self, record):
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode()
+        with self.lock, self._process_lock():
+            self._load()
+            current = self._catch_up()
+            if current is None or self.index["segments"][current]["bytes"] + len(line) > self.max_bytes:
+                current = f"segment_{self._segment_number(current) + 1 if current else 1:06d}.jsonl"
+                self.index["segments"][current] = self._empty_entry()
+                self.save_index()
+            self._open_writer(current)
+            self.writer.write(line)
+            self.writer.flush()
+            self._account(self.index["segments"][current], record, len(line))
+
+    def save_index(self):
+        with self.lock:
+            if self.index is not None:
+                save_json_cache(self.index_file, self.index)
+
+    def close(self):
+        with self.lock:
+            if self.writer:
+                self.writer.close()
+                self.writer = None
+                self.writer_name = None
+            self.save_index()
+
+    def reload(self):
+        """Re-read the index and fold in records appended by other processes."""
+        with self.lock:
+            self.index = None
+            self._load()
+
+    def recent(self, limit, action=None):
+        """Return the last `limit` records, optionally for one action, oldest first."""
+        found = collections.deque(maxlen=limit)
+        for path in reversed(self.segments_for(action)):
+            matching = collections.deque(maxlen=limit)
+            with open(path, "rb") as f:
+                for raw in f:
+                    try:
+                        record = json.loads(raw)
+                    except ValueError:
+                        continue
+                    if action is None or record["action"] == action:
+                        matching.append(record)
+            found.extendleft(reversed(matching))
+            if len(found) >= limit:
+                break
+        return list(found)[-limit:] if limit else []
+
+    def segment_summaries(self):
+        """Return [(path, index entry)] for every segment except the one being written."""
+        with self.lock:
+            self._load()
+            return [
+                (self._segment_path(name), dict(entry))
+                for name, entry in sorted(self.index["segments"].items())
+                if name != self.index["current"]
+            ]
+
+    def remove_segments(self, paths):
+        """Delete closed segments and drop them from the index."""
+        with self.lock, self._process_lock():
+            self._load()
+            self._catch_up()
+            for path in paths:
+                name = Path(path).name
+                if name == self.index["current"] or name not in self.index["segments"]:
+                    continue
+                Path(path).unlink(missing_ok=True)
+                del self.index["segments"][name]
+            self.save_index()
+
+    def actions(self):
+        """Return {action: {"count", "first", "last", "segments"}} from the index."""
+        with self.lock:
+            self._load()
+            summary = {}
+            for name, entry in sorted(self.index["segments"].items()):
+                for action, info in entry["actions"].items():
+                    total = summary.setdefault(action, {"count": 0, "first": info["first"], "last": info["last"], "segments": []})
+                    total["count"] += info["count"]
+                    total["first"] = min(total["first"], info["first"])
+                    total["last"] = max(total["last"], info["last"])
+                    total["segments"].append(name)
+            return summary
+
+    def segments_for(self, action=None, since=None, until=None):
+        """Return segment paths that may hold matching records, oldest first."""
+        with self.lock:
+            self._load()
+            selected = []
+            for name, entry in sorted(self.index["segments"].items()):
+                if not entry["records"]:
+                    continue
+                if action is not None and action not in entry["actions"]:
+                    continue
+                if since and entry["last"] < since:
+                    continue
+                if until and entry["first"] > until:
+                    continue
+                selected.append(self._segment_path(name))
+            return selected
+
+    def records(self, action=None, since=None, until=None):
+        """Yield log records, optionally filtered by action and time range."""
+        with self.lock:
+            if self.writer:
+                self.writer.flush()
+        for path in self.segments_for(action, since, until):
+            with open(path, "rb") as f:
+                for raw in f:
+                    try:
+                        record = json.loads(raw)
+                    except ValueError:
+                        continue
+                    if action is not None and record["action"] != action:
+                        continue
+                    if since and record["timestamp"] < since:
+                        continue
+                    if until and record["timestamp"] > until:
+                        continue
+                    yield record
+
+
+LOG_STORE = SegmentLogStore(LOG_STORE_DIR)
+atexit.register(LOG_STORE.close)
+
+def log_action(log_name, message, output="", duration=None, status=None):
     timestamp = datetime.datetime.now()
-    log_file = LOG_DIR / f"{log_name}_{timestamp.strftime('%Y%m%d_%H_%M_%S')}.log"
-    time_str = timestamp.strftime('%Y-%m-%d %H:%M:%S')
-    with open(log_file, "a") as f:
-        f.write(f"[{time_str}] {message}\n")
-        if output:
-            f.write(f"{output}\n\n")
+    LOG_STORE.append({
+        "timestamp": timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+        "action": log_name,
+        "message": message,
+        "output": output,
+        "duration": duration,
+        "status": status,
+    })
 
+def format_log_record(record):
+    """Render a record the way legacy per-action log files looked."""
+    text = f"[{record['timestamp']}] {record['message']}\n"
+    if record.get("output"):
+        text += f"{record['output']}\n\n"
+    return text
+
+CommandResult = collections.namedtuple("CommandResult", ["returncode", "output", "duration"])
+
+PERF_STATS = {"commands": {}, "stages": {}}
+# sudo options that take their value as the next word
+SUDO_OPTIONS_WITH_VALUE = {"-u", "-g", "-C", "-p", "-h", "-r", "-t", "-U", "-D", "-R", "-T",
+                           "--user", "--group", "--close-from", "--prompt", "--host", "--role",
+                           "--type", "--other-user", "--chdir", "--chroot", "--command-timeout"}
+PERF_STATS_LOCK = threading.Lock()
+
+def classify_command(command):
+    """Name the kind of a spawned command for the performance stats."""
+    text = command if isinstance(command, str) else " ".join(str(part) for part in command)
+    if PACKAGE_PROBE in text:
+        return "package_probe"
+    if MODULE_PROBE in text:
+        return "module_probe"
+    if text.endswith("--version"):
+        return "version_probe"
+    match = re.search(r"-m pip (index|install|uninstall|show|freeze|list|download|wheel)", text)
+    if match:
+        return f"pip_{match.group(1)}"
+    words = text.split()
+    if words and words[0] == "sudo":
+        words.pop(0)
+        while words and words[0].startswith("-"):
+            option = words.pop(0)
+            if option == "--":
+                break
+            if option in SUDO_OPTIONS_WITH_VALUE and words:
+                words.pop(0)
+    if words and words[0] in PACKAGE_MANAGER_BACKENDS:
+        return words[0]
+    return Path(words[0]).name if words else "other"
+
+def record_command(command, seconds, returncode, output_bytes):
+    kind = classify_command(command)
+    with PERF_STATS_LOCK:
+        stats = PERF_STATS["commands"].setdefault(
+            kind, {"count": 0, "seconds": 0.0, "failures": 0, "output_bytes": 0, "max_seconds": 0.0})
+        stats["count"] += 1
+        stats["seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+        stats["failures"] += returncode != 0
+        stats["output_bytes"] += output_bytes
+
+@contextlib.contextmanager
+def timed_stage(name):
+    """Add the wall time of a block to the performance stats for an internal stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        with PERF_STATS_LOCK:
+            stats = PERF_STATS["stages"].setdefault(name, {"count": 0, "seconds": 0.0, "max_seconds": 0.0})
+            stats["count"] += 1
+            stats["seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+
+def run_subprocess(command, **kwargs):
+    """subprocess.run that records the call in the performance stats."""
+    start = time.perf_counter()
+    returncode = 127
+    output_bytes = 0
+    try:
+        result = subprocess.run(command, **kwargs)
+        returncode = result.returncode
+        output_bytes = sum(len(out) for out in (result.stdout, result.stderr) if out)
+        return result
+    except subprocess.TimeoutExpired:
+        returncode = -9
+        raise
+    finally:
+        record_command(command, time.perf_counter() - start, returncode, output_bytes)
+
+
+class OutputTee:
+    """Fans command output out to the terminal, an optional file and the log.
+
+    Only the last COMMAND_TAIL_LINES lines are kept in memory; the log receives
+    the whole transcript in COMMAND_LOG_CHUNK_BYTES pieces, and the final record
+    carries the exit status and duration.
+    """
+
+    def __init__(self, log_name=None, message="", echo=True, prefix="", output_file=None, command=None):
+        self.command = command
+        self.output_bytes = 0
+        self.log_name = log_name
+        self.message = message
+        self.echo = echo
+        self.prefix = prefix
+        self.out = open(output_file, "w") if output_file else None
+        self.start = time.time()
+        self.tail = collections.deque(maxlen=COMMAND_TAIL_LINES)
+        self.chunk = []
+        self.chunk_bytes = 0
+
+    def feed(self, line):
+        if self.echo:
+            print(self.prefix + line, flush=True)
+        if self.out:
+            self.out.write(line + "\n")
+        self.tail.append(line)
+        self.output_bytes += len(line) + 1
+        if self.log_name:
+            self.chunk.append(line)
+            self.chunk_bytes += len(line) + 1
+            if self.chunk_bytes >= COMMAND_LOG_CHUNK_BYTES:
+                log_action(self.log_name, f"{self.message} (output continued)", "\n".join(self.chunk))
+                self.chunk = []
+                self.chunk_bytes = 0
+
+    def finish(self, returncode):
+        if self.out:
+            self.out.close()
+            self.out = None
+        duration = round(time.time() - self.start, 3)
+        if self.command is not None:
+            record_command(self.command, duration, returncode, self.output_bytes)
+        if self.log_name:
+            log_action(self.log_name, self.message, "\n".join(self.chunk), duration=duration, status=returncode)
+        return CommandResult(returncode, "\n".join(self.tail), duration)
+
+def run_command(command, log_name=None, message="", echo=True, prefix="", output_file=None, merge_stderr=True):
+    """Run a command, streaming each output line to the terminal and the log as it arrives.
+
+    A string runs through the shell. With output_file, stdout is also written
+    there (stderr then goes straight to the terminal).
+    """
+    try:
+        process = subprocess.Popen(
+            command,
+            shell=isinstance(command, str),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT if merge_stderr and not output_file else None,
+            text=True,
+            errors="replace",
+            bufsize=1
+        )
+    except OSError as e:
+        record_command(command, 0, 127, 0)
+        if log_name:
+            log_action(log_name, message, str(e), duration=0, status=127)
+        return CommandResult(127, str(e), 0)
+
+    tee = OutputTee(log_name, message, echo, prefix, output_file, command)
+    try:
+        with process:
+            for line in process.stdout:
+                tee.feed(line.rstrip("\n"))
+    finally:
+        result = tee.finish(process.returncode)
+    return result
+
+@functools.lru_cache(maxsize=None)
 def get_linux_distro():
+    if PACKAGE_MANAGER_OVERRIDE:
+        return PACKAGE_MANAGER_OVERRIDE
     if Path("/etc/os-release").exists():
         with open("/etc/os-release") as f:
             data = f.read()
             if "ID=ubuntu" in data or "ID=debian" in data:
                 return "apt"
             elif any(distro in data for distro in ["centos", "rhel", "fedora", "almalinux"]):
-                return "yum"
+                return "dnf" if shutil.which("dnf") else "yum"
     return None
 
-def find_installed_python_versions():
-    seen = set()
-    versions = []
+
+class PackageManagerBackend(abc.ABC):
+    """System package manager used to install and remove Python versions."""
+
+    name = None
+    metadata_globs = []
+
+    def package_name(self, version):
+        return f"python{version}"
+
+    def metadata_age(self):
+        """Seconds since the package lists were last refreshed, or None if unknown."""
+        mtimes = [os.stat(path).st_mtime for pattern in self.metadata_globs for path in glob.glob(pattern)]
+        return time.time() - max(mtimes) if mtimes else None
+
+    def metadata_is_fresh(self, max_age=PACKAGE_METADATA_MAX_AGE):
+        age = self.metadata_age()
+        return age is not None and age < max_age
+
+    @abc.abstractmethod
+    def refresh_command(self):
+        """Shell command that refreshes the package lists."""
+
+    @abc.abstractmethod
+    def install_command(self, packages):
+        """Shell command that installs every package in one transaction."""
+
+    @abc.abstractmethod
+    def remove_command(self, packages):
+        """Shell command that removes every package in one transaction."""
+
+    def run(self, command, log_name=None):
+        return run_command(command, log_name, f"Ran {command}")
+
+    def refresh(self, max_age=PACKAGE_METADATA_MAX_AGE, log_name=None):
+        """Refresh package lists unless they are newer than max_age; return the result or None if skipped."""
+        if self.metadata_is_fresh(max_age):
+            return None
+        return self.run(self.refresh_command(), log_name)
+
+    def install(self, versions, max_age=PACKAGE_METADATA_MAX_AGE, log_name=None):
+        """Install several Python versions with at most one refresh and one transaction."""
+        packages = [self.package_name(v) for v in versions]
+        refresh_result = self.refresh(max_age, log_name)
+        if refresh_result and refresh_result.returncode != 0:
+            return refresh_result
+        return self.run(self.install_command(packages), log_name)
+
+    def remove(self, versions, log_name=None):
+        return self.run(self.remove_command([self.package_name(v) for v in versions]), log_name)
+
+    def install_shell_command(self, versions, max_age=PACKAGE_METADATA_MAX_AGE):
+        """One shell command doing the same as install(), for running it as a background job.
+
+        sudo runs with -n so a background job fails instead of prompting;
+        validate the credentials with `sudo -v` in the foreground first.
+        """
+        command = self.install_command([self.package_name(v) for v in versions])
+        if not self.metadata_is_fresh(max_age):
+            command = f"{self.refresh_command()} && {command}"
+        return re.sub(r"\bsudo ", "sudo -n ", command)
+
+
+class AptBackend(PackageManagerBackend):
+    name = "apt"
+    metadata_globs = ["/var/lib/apt/lists", "/var/lib/apt/periodic/update-success-stamp"]
+
+    def refresh_command(self):
+        return "sudo apt update"
+
+    def install_command(self, packages):
+        return f"sudo apt install -y {' '.join(packages)}"
+
+    def remove_command(self, packages):
+        return f"sudo apt remove -y {' '.join(packages)}"
+
+
+class DnfBackend(PackageManagerBackend):
+    name = "dnf"
+    metadata_globs = ["/var/cache/dnf/*/repodata/repomd.xml"]
+
+    def refresh_command(self):
+        return f"sudo {self.name} makecache"
+
+    def install_command(self, packages):
+        return f"sudo {self.name} install -y {' '.join(packages)}"
+
+    def remove_command(self, packages):
+        return f"sudo {self.name} remove -y {' '.join(packages)}"
+
+
+class YumBackend(DnfBackend):
+    name = "yum"
+    metadata_globs = ["/var/cache/yum/*/*/*/repomd.xml", "/var/cache/yum/*/repomd.xml"]
+
+
+class FakeBackend(PackageManagerBackend):
+    """Records commands instead of running them; used for tests and dry runs."""
+
+    name = "fake"
+
+    def __init__(self, metadata_age=None):
+        self.age = metadata_age
+        self.commands = []
+
+    def metadata_age(self):
+        return self.age
+
+    def refresh_command(self):
+        return "echo fake refresh"
+
+    def install_command(self, packages):
+        return f"echo fake install {' '.join(packages)}"
+
+    def remove_command(self, packages):
+        return f"echo fake remove {' '.join(packages)}"
+
+    def run(self, command, log_name=None):
+        self.commands.append(command)
+        if command == self.refresh_command():
+            self.age = 0
+        return CommandResult(0, command, 0)
+
+
+PACKAGE_MANAGER_BACKENDS = {
+    "apt": AptBackend,
+    "dnf": DnfBackend,
+    "yum": YumBackend,
+    "fake": FakeBackend,
+}
+
+@functools.lru_cache(maxsize=None)
+def get_package_manager():
+    """Return the package-manager backend for this host, or None if unsupported."""
+    backend = PACKAGE_MANAGER_BACKENDS.get(get_linux_distro())
+    return backend() if backend else None
+
+def load_json_cache(cache_file, default):
+    """Load a JSON cache file, falling back to a default if missing or corrupt."""
+    try:
+        with open(cache_file) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def save_json_cache(cache_file, data):
+    """Atomically write a JSON cache file; concurrent writers each use their own temp file."""
+    cache_file = Path(cache_file)
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_file = tempfile.mkstemp(dir=cache_file.parent, prefix=cache_file.name + ".", suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        Path(tmp_file).unlink(missing_ok=True)
+
+def file_signature(path):
+    """Return (inode, size, mtime) used to detect a changed file."""
+    st = os.stat(path)
+    return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+def probe_python_version(real_path, timeout=PROBE_TIMEOUT):
+    """Return the `--version` output of an interpreter, or None if it did not answer in time."""
+    try:
+        return run_subprocess(
+            f"{real_path} --version", shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            text=True, timeout=timeout,
+        ).stdout.strip()
+    except subprocess.TimeoutExpired:
+        return None
+
+def find_python_binaries():
+    """Return (path, realpath) for every python3 executable on PATH."""
+    binaries = []
     for path in os.environ["PATH"].split(":"):
         if Path(path).exists():
             for file in os.listdir(path):
                 if re.fullmatch(r"python3(\.\d+)?", file):
                     full_path = Path(path) / file
                     if os.access(full_path, os.X_OK):
-                        version_output = subprocess.getoutput(f"{full_path} --version")
-                        entry = (version_output.strip(), str(full_path))
-                        if entry not in seen:
-                            seen.add(entry)
-                            versions.append(entry)
+                        binaries.append((str(full_path), os.path.realpath(full_path)))
+    return binaries
+
+@timed_stage("interpreter_inventory")
+def find_installed_python_versions():
+    binaries = find_python_binaries()
+    cache = load_json_cache(INVENTORY_CACHE, {})
+    inventory = {}
+    to_probe = []
+
+    # Symlinks such as python3 -> python3.11 collapse to one realpath,
+    # and only binaries whose signature changed are probed again.
+    for real_path in {real for _, real in binaries}:
+        try:
+            signature = file_signature(real_path)
+        except OSError:
+            continue
+        cached = cache.get(real_path)
+        if cached and cached.get("signature") == signature:
+            inventory[real_path] = cached
+        else:
+            to_probe.append((real_path, signature))
+
+    if to_probe:
+        with ThreadPoolExecutor(max_workers=min(PROBE_WORKERS, len(to_probe))) as pool:
+            results = pool.map(probe_python_version, [real for real, _ in to_probe])
+            for (real_path, signature), version_output in zip(to_probe, results):
+                # A hung interpreter is left out and not cached, so it is probed again next time.
+                if version_output is not None:
+                    inventory[real_path] = {"version": version_output, "signature": signature}
+
+    if to_probe or inventory.keys() != cache.keys():
+        save_json_cache(INVENTORY_CACHE, inventory)
+
+    seen = set()
+    versions = []
+    for full_path, real_path in binaries:
+        if real_path not in inventory:
+            continue
+        entry = (inventory[real_path]["version"], full_path)
+        if entry not in seen:
+            seen.add(entry)
+            versions.append(entry)
     return sorted(versions)
 
+def discover_interpreters():
+    """Return (name, path) for each distinct working interpreter, one per realpath."""
+    interpreters = {}
+    for version, path in find_installed_python_versions():
+        if version.startswith("Python "):
+            interpreters.setdefault(os.path.realpath(path), (Path(path).name, path))
+    return sorted(interpreters.values(), key=lambda i: (i[0], i[1]))
+
+def python_command(version):
+    """Interpreter command for a menu target: a version such as 3.11 or a path to an interpreter."""
+    return version if "/" in version else f"python{version}"
+
+def read_pyvenv_cfg(env_dir):
+    config = {}
+    with open(Path(env_dir) / "pyvenv.cfg") as f:
+        for line in f:
+            key, sep, value = line.partition("=")
+            if sep:
+                config[key.strip().lower()] = value.strip()
+    return config
+
+def describe_environment(env_dir, names):
+    """Return an environment record for a directory holding pyvenv.cfg or conda-meta, else None."""
+    python = str(Path(env_dir) / "bin" / "python")
+    if "pyvenv.cfg" in names:
+        try:
+            config = read_pyvenv_cfg(env_dir)
+        except OSError:
+            config = {}
+        base = config.get("executable") or (str(Path(config["home"]) / "python3") if "home" in config else "")
+        version = config.get("version_info") or config.get("version") or ""
+        return {"path": env_dir, "type": "venv", "python": python, "base": base, "version": version}
+    if "conda-meta" in names:
+        version = ""
+        try:
+            for entry in os.scandir(Path(env_dir) / "conda-meta"):
+                match = re.fullmatch(r"python-(\d+\.\d+\.\d+)-.*\.json", entry.name)
+                if match:
+                    version = match.group(1)
+                    break
+        except OSError:
+            pass
+        parent = Path(env_dir).parent
+        base = str(parent.parent / "bin" / "python") if parent.name == "envs" else python
+        return {"path": env_dir, "type": "conda", "python": python, "base": base, "version": version}
+    return None
+
+def scan_environment_dir(directory, cached):
+    """Visit one directory: reuse the cached listing when its mtime is unchanged, else scandir it."""
+    try:
+        mtime = os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+    if cached and cached["mtime"] == mtime:
+        return cached
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return {"mtime": mtime, "env": None, "children": []}
+    names = {entry.name for entry in entries}
+    env = describe_environment(directory, names)
+    if env and env["type"] == "venv":
+        children = []  # nothing to find inside a venv
+    elif env:
+        children = [str(Path(directory) / "envs")] if "envs" in names else []
+    else:
+        children = [
+            entry.path for entry in entries
+            if entry.name not in ENV_SKIP_DIRS and entry.path not in ENV_SKIP_PATHS
+            and entry.is_dir(follow_symlinks=False)
+        ]
+    return {"mtime": mtime, "env": env, "children": children}
+
+@timed_stage("environment_discovery")
+def discover_environments(roots=None, max_depth=ENV_SEARCH_MAX_DEPTH):
+    """Find venvs and conda envs under the search roots.
+
+    Directories are visited level by level on a thread pool. A directory whose
+    mtime is unchanged since the last scan is only stat()ed, and its cached
+    child list is reused.
+    """
+    cache = load_json_cache(ENV_CACHE, {})
+    new_cache = {}
+    environments = []
+    frontier = [os.path.abspath(os.path.expanduser(r)) for r in (roots or ENV_SEARCH_ROOTS) if r]
+    depth = 0
+    with ThreadPoolExecutor(max_workers=ENV_SCAN_WORKERS) as pool:
+        while frontier and depth <= max_depth:
+            results = pool.map(lambda d: scan_environment_dir(d, cache.get(d)), frontier)
+            next_frontier = []
+            for directory, result in zip(frontier, results):
+                if result is None or directory in new_cache:
+                    continue
+                new_cache[directory] = result
+                if result["env"]:
+                    environments.append(result["env"])
+                next_frontier.extend(result["children"])
+            frontier = next_frontier
+            depth += 1
+    save_json_cache(ENV_CACHE, new_cache)
+    return sorted(environments, key=lambda e: e["path"])
+
+def list_environments():
+    environments = discover_environments()
+    print(Fore.CYAN + f"\nDiscovered Environments (roots: {', '.join(ENV_SEARCH_ROOTS)}):\n")
+    output = ""
+    if not environments:
+        output = "No virtualenv or conda environments found."
+        print(Fore.YELLOW + output)
+    for number, env in enumerate(environments, start=1):
+        line = f"{number}. [{env['type']}] {env['path']} (Python {env['version'] or '?'}, base: {env['base'] or '?'})"
+        print(Fore.GREEN + line)
+        output += line + "\n"
+    log_action("list_environments", "Listed virtualenv and conda environments.", output.strip())
+    return environments
+
+def choose_environment():
+    """Let the user pick a discovered environment; return its interpreter path or None."""
+    environments = list_environments()
+    choice = input(Fore.CYAN + "\nEnter environment number: ").strip()
+    if choice.isdigit() and 1 <= int(choice) <= len(environments):
+        return environments[int(choice) - 1]["python"]
+    print(Fore.RED + "Invalid environment number.")
+    return None
+
+def installed_python_versions():
+    """Interpreter inventory from a running daemon with the same PATH, else a local scan."""
+    warm = daemon_query("versions", path=os.environ["PATH"])
+    if warm is not None:
+        return [tuple(entry) for entry in warm]
+    return find_installed_python_versions()
+
 def list_python_versions():
-    versions = find_installed_python_versions()
+    versions = installed_python_versions()
     print(Fore.CYAN + "\nInstalled Python Versions:\n")
     output = ""
     if not versions:
@@ -64,47 +1017,59 @@ def list_python_versions():
 
 def install_python_version():
     list_python_versions()
-    version = input(Fore.CYAN + "\nEnter Python version to install (e.g., 3.9): ")
-    package_manager = get_linux_distro()
+    answer = input(Fore.CYAN + "\nEnter Python version(s) to install (e.g., 3.9 or 3.10 3.11): ")
+    versions = [v for v in re.split(r"[,\s]+", answer) if v]
+    package_manager = get_package_manager()
     if not package_manager:
         print(Fore.RED + "Unsupported Linux distribution.")
         return
+    if not versions:
+        print(Fore.RED + "No Python version given.")
+        return
 
-    print(Fore.YELLOW + f"\nInstalling Python {version}...")
-    if package_manager == "apt":
-        output = subprocess.getoutput(f"sudo apt update && sudo apt install -y python{version}")
-    else:
-        output = subprocess.getoutput(f"sudo yum install -y python{version}")
+    label = ", ".join(versions)
+    if package_manager.metadata_is_fresh():
+        print(Fore.YELLOW + f"\n{package_manager.name} package lists are recent; skipping metadata refresh.")
+    print(Fore.YELLOW + f"\nInstalling Python {label}...")
+    result = package_manager.install(versions, log_name="install_python_version")
 
-    print(Fore.GREEN + output)
-    log_action("install_python_version", f"Installed Python {version}", output)
+    if result.returncode == 0:
+        print(Fore.GREEN + f"Installed Python {label} in {result.duration}s.")
+    else:
+        print(Fore.RED + f"Installing Python {label} failed with exit code {result.returncode}.")
 
 def uninstall_python_version():
     list_python_versions()
-    version = input(Fore.CYAN + "\nEnter Python version to uninstall (e.g., 3.9): ")
-    package_manager = get_linux_distro()
+    answer = input(Fore.CYAN + "\nEnter Python version(s) to uninstall (e.g., 3.9 or 3.10 3.11): ")
+    versions = [v for v in re.split(r"[,\s]+", answer) if v]
+    package_manager = get_package_manager()
     if not package_manager:
         print(Fore.RED + "Unsupported Linux distribution.")
         return
+    if not versions:
+        print(Fore.RED + "No Python version given.")
+        return
 
-    print(Fore.YELLOW + f"\nUninstalling Python {version}...")
-    if package_manager == "apt":
-        output = subprocess.getoutput(f"sudo apt remove -y python{version}")
-    else:
-        output = subprocess.getoutput(f"sudo yum remove -y python{version}")
+    label = ", ".join(versions)
+    print(Fore.YELLOW + f"\nUninstalling Python {label}...")
+    output = package_manager.remove(versions, log_name="uninstall_python_version").output
 
-    bin_path = Path(f"/usr/bin/python{version}")
     remove_output = ""
-    if bin_path.exists():
-        rm_result = subprocess.getoutput(f"sudo rm -f {bin_path}")
-        remove_output = f"Removed binary at {bin_path}\n{rm_result}"
-        print(Fore.GREEN + remove_output)
+    for version in versions:
+        bin_path = Path(f"/usr/bin/python{version}")
+        if bin_path.exists():
+            rm_result = run_subprocess(
+                f"sudo rm -f {bin_path}", shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+            ).stdout.strip()
+            remove_output += f"Removed binary at {bin_path}\n{rm_result}\n"
+    if remove_output:
+        print(Fore.GREEN + remove_output.strip())
 
     full_output = output + "\n" + remove_output
-    log_action("uninstall_python_version", f"Uninstalled Python {version}", full_output.strip())
+    log_action("uninstall_python_version", f"Uninstalled Python {label}", full_output.strip())
 
 def show_all_python_paths():
-    versions = find_installed_python_versions()
+    versions = installed_python_versions()
     print(Fore.CYAN + "\nAll Installed Python Binaries and Paths:\n")
     output = ""
     for version, path in versions:
@@ -115,7 +1080,7 @@ def show_all_python_paths():
 
 def show_path_for_version():
     version = input(Fore.CYAN + "\nEnter Python version to lookup path (e.g., 3.9): ")
-    versions = find_installed_python_versions()
+    versions = installed_python_versions()
     found = False
     output = ""
     for v, path in versions:
@@ -129,147 +1094,1073 @@ def show_path_for_version():
         print(Fore.RED + output)
     log_action("show_path_for_version", f"Checked path for version {version}", output)
 
+def normalize_package_name(name):
+    """Normalize a distribution name as pip does (PEP 503)."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+def requirement_name(requirement):
+    """Return the bare distribution name of a Requires-Dist entry."""
+    match = re.match(r"\s*([A-Za-z0-9][A-Za-z0-9._-]*)", requirement)
+    return match.group(1) if match else requirement.strip()
+
+def probe_error(result):
+    """Last line of a failed command's stderr, which carries the exception message."""
+    lines = (result.stderr or "").strip().splitlines()
+    return lines[-1] if lines else f"exit code {result.returncode}"
+
+def probe_packages_with_pip(python_exec, timeout=PACKAGE_PROBE_TIMEOUT):
+    """`pip list` fallback for interpreters older than 3.8, which lack importlib.metadata."""
+    try:
+        result = run_subprocess(
+            [python_exec, "-m", "pip", "list", "-v", "--format=json", "--disable-pip-version-check"],
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        return None, f"pip list timed out after {timeout}s"
+    except OSError as e:
+        return None, str(e)
+    if result.returncode != 0:
+        return None, probe_error(result)
+    try:
+        listed = json.loads(result.stdout)
+    except ValueError:
+        return None, "unreadable pip list output"
+    packages = {}
+    for item in listed:
+        packages.setdefault(normalize_package_name(item["name"]), {
+            "name": item["name"],
+            "version": item["version"],
+            "location": item.get("location", ""),
+            "requires": [],
+            "installer": item.get("installer", ""),
+        })
+    return packages, None
+
+def probe_packages(python_exec, timeout=PACKAGE_PROBE_TIMEOUT):
+    """Return ({normalized name: package info}, None), or (None, error) when the interpreter cannot be read."""
+    try:
+        result = run_subprocess(
+            [python_exec, "-c", PACKAGE_PROBE],
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        return None, f"package probe timed out after {timeout}s"
+    except OSError as e:
+        return None, str(e)
+    if result.returncode != 0:
+        if re.search(r"(ImportError|ModuleNotFoundError).*metadata", result.stderr or ""):
+            return probe_packages_with_pip(python_exec, timeout)
+        return None, probe_error(result)
+    try:
+        listed = json.loads(result.stdout)
+    except ValueError:
+        return None, "unreadable package probe output"
+    packages = {}
+    for package in listed:
+        # Keep the first match on sys.path, which is the one Python imports
+        packages.setdefault(normalize_package_name(package["name"]), package)
+    return packages, None
+
+def get_installed_packages(python_exec, timeout=PACKAGE_PROBE_TIMEOUT):
+    """Return {normalized name: package info} for an interpreter, or None on failure."""
+    return probe_packages(python_exec, timeout)[0]
+
+def find_package(packages, name):
+    return (packages or {}).get(normalize_package_name(name))
+
+def format_package_info(package):
+    requires = sorted({requirement_name(r) for r in package["requires"] if "extra ==" not in r})
+    return "\n".join([
+        f"Name: {package['name']}",
+        f"Version: {package['version']}",
+        f"Location: {package['location']}",
+        f"Requires: {', '.join(requires)}",
+        f"Installer: {package['installer']}",
+    ])
+
+def parse_metadata_headers(path):
+    """Return (name, version, requires) from a METADATA/PKG-INFO file, reading only the header block."""
+    headers = collections.defaultdict(list)
+    key = None
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if line in ("\n", "\r\n"):
+                break
+            if line[:1] in (" ", "\t") and key:
+                headers[key][-1] += " " + line.strip()
+                continue
+            key, sep, value = line.partition(":")
+            key = key.strip().lower() if sep else None
+            if key:
+                headers[key].append(value.strip())
+    name = (headers.get("name") or [""])[0]
+    version = (headers.get("version") or [""])[0]
+    return name, version, headers.get("requires-dist", [])
+
+def read_egg_requires(path):
+    """Convert an egg-info requires.txt into Requires-Dist style strings."""
+    requires = []
+    marker = ""
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if line.startswith("["):
+                    section = line.strip("[]")
+                    extra, _, condition = section.partition(":")
+                    marker = " and ".join(filter(None, [f'extra == "{extra}"' if extra else "", condition]))
+                    continue
+                requires.append(f"{line}; {marker}" if marker else line)
+    except OSError:
+        pass
+    return requires
+
+def read_distribution(entry_path):
+    """Read one *.dist-info or *.egg-info entry; return a record or None."""
+    if entry_path.endswith(".dist-info"):
+        metadata_file = os.path.join(entry_path, "METADATA")
+    elif os.path.isdir(entry_path):
+        metadata_file = os.path.join(entry_path, "PKG-INFO")
+    else:
+        metadata_file = entry_path  # single-file egg-info
+    try:
+        mtime = os.stat(metadata_file).st_mtime_ns
+        name, version, requires = parse_metadata_headers(metadata_file)
+    except OSError:
+        return None
+    if entry_path.endswith(".egg-info") and metadata_file != entry_path:
+        requires = requires or read_egg_requires(os.path.join(entry_path, "requires.txt"))
+    if not name:
+        return None
+    return {"mtime": mtime, "name": name, "version": version, "requires": requires}
+
+def scan_distributions(directory, cached):
+    """Return the cache entry for one sys.path directory, re-reading only changed dist-info entries."""
+    try:
+        mtime = os.stat(directory).st_mtime_ns
+    except OSError:
+        return {"mtime": None, "dists": {}}
+    if cached and cached["mtime"] == mtime:
+        return cached
+    old = cached["dists"] if cached else {}
+    dists = {}
+    try:
+        entries = [e for e in os.scandir(directory) if e.name.endswith((".dist-info", ".egg-info"))]
+    except OSError:
+        entries = []
+    for entry in entries:
+        previous = old.get(entry.name)
+        if previous:
+            metadata_file = entry.path if entry.is_file() else os.path.join(
+                entry.path, "METADATA" if entry.name.endswith(".dist-info") else "PKG-INFO")
+            try:
+                if os.stat(metadata_file).st_mtime_ns == previous["mtime"]:
+                    dists[entry.name] = previous
+                    continue
+            except OSError:
+                continue
+        record = read_distribution(entry.path)
+        if record:
+            dists[entry.name] = record
+    return {"mtime": mtime, "dists": dists}
+
+SPECIFIER_PATTERN = re.compile(r"(~=|===|==|!=|<=|>=|<|>)\s*([^,\s)]+)")
+MARKER_TOKEN = re.compile(r"""\s*(?:(\()|(\))|\b(and|or)\b|([\w.]+|'[^']*'|"[^"]*")\s*(===|==|!=|<=|>=|<|>|~=|not\s+in|in)\s*([\w.]+|'[^']*'|"[^"]*"))""")
+
+def version_matches(version, operator, wanted):
+    """Check one PEP 440 specifier clause using version_sort_key ordering."""
+    if operator == "===":
+        return version == wanted
+    if wanted.endswith(".*") and operator in ("==", "!="):
+        prefix = wanted[:-2].split(".")
+        matched = version.split(".")[:len(prefix)] == prefix
+        return matched if operator == "==" else not matched
+    have, want = version_sort_key(version), version_sort_key(wanted)
+    # Pad so that 1.0 and 1.0.0 compare equal
+    width = max(len(have), len(want))
+    have += [(0, "")] * (width - len(have))
+    want += [(0, "")] * (width - len(want))
+    if operator == "~=":
+        prefix = wanted.split(".")[:-1]
+        return have >= want and version.split(".")[:len(prefix)] == prefix
+    return {
+        "==": have == want, "!=": have != want, "<=": have <= want,
+        ">=": have >= want, "<": have < want, ">": have > want,
+    }[operator]
+
+def tokenize_marker(marker):
+    """Split a marker into "(", ")", "and", "or" and (left, op, right) tokens, or None if it is malformed."""
+    tokens = []
+    pos = 0
+    marker = marker.strip()
+    while pos < len(marker):
+        match = MARKER_TOKEN.match(marker, pos)
+        if not match or match.end() == pos:
+            return None
+        opening, closing, keyword, left, operator, right = match.groups()
+        if left:
+            tokens.append((left, re.sub(r"\s+", " ", operator), right))
+        else:
+            tokens.append(opening or closing or keyword)
+        pos = match.end()
+        while pos < len(marker) and marker[pos].isspace():
+            pos += 1
+    return tokens
+
+def marker_applies(marker, environment):
+    """Evaluate an environment marker with and/or/parentheses; 'extra' clauses never apply.
+
+    Malformed markers and unknown variables count as applying.
+    """
+    def clause(left, operator, right):
+        if "extra" in (left, right):
+            return False
+        left = left.strip("'\"") if left[0] in "'\"" else environment.get(left)
+        right = right.strip("'\"") if right[0] in "'\"" else environment.get(right)
+        if left is None or right is None:
+            return True
+        if operator == "in":
+            return left in right
+        if operator == "not in":
+            return left not in right
+        if re.fullmatch(r"[\d.]+", left) and re.fullmatch(r"[\d.*]+", right):
+            return version_matches(left, operator, right)
+        return {"==": left == right, "!=": left != right, "===": left == right}.get(operator, True)
+
+    tokens = tokenize_marker(marker)
+    if not tokens:
+        return True
+    pos = 0
+
+    # expression := conjunction ("or" conjunction)*; conjunction := atom ("and" atom)*
+    def expression():
+        nonlocal pos
+        value = conjunction()
+        while pos < len(tokens) and tokens[pos] == "or":
+            pos += 1
+            value = conjunction() or value
+        return value
+
+    def conjunction():
+        nonlocal pos
+        value = atom()
+        while pos < len(tokens) and tokens[pos] == "and":
+            pos += 1
+            value = atom() and value
+        return value
+
+    def atom():
+        nonlocal pos
+        token = tokens[pos]
+        pos += 1
+        if token == "(":
+            value = expression()
+            if pos >= len(tokens) or tokens[pos] != ")":
+                raise ValueError("unbalanced parentheses")
+            pos += 1
+            return value
+        if isinstance(token, tuple):
+            return clause(*token)
+        raise ValueError(f"unexpected {token!r}")
+
+    try:
+        value = expression()
+    except (IndexError, ValueError):
+        return True
+    return value if pos == len(tokens) else True
+
+def parse_requirement(requirement):
+    """Split a Requires-Dist entry into (name, [(op, version)], marker)."""
+    requirement, _, marker = requirement.partition(";")
+    name = requirement_name(requirement)
+    rest = requirement.strip()[len(name):]
+    rest = re.sub(r"^\s*\[[^\]]*\]", "", rest)  # extras of the dependency
+    return name, SPECIFIER_PATTERN.findall(rest.split("@")[0]), marker.strip()
+
+class DependencyGraph:
+    """Forward and reverse dependency indexes over one interpreter's installed distributions."""
+
+    def __init__(self, distributions, environment):
+        self.environment = environment
+        self.packages = {}
+        for dist in distributions:
+            # The first distribution on sys.path wins, as for imports
+            self.packages.setdefault(normalize_package_name(dist["name"]), dist)
+        self.forward = {}
+        self.reverse = collections.defaultdict(dict)
+        for key, dist in self.packages.items():
+            edges = {}
+            for raw in dist["requires"]:
+                name, specifiers, marker = parse_requirement(raw)
+                if marker and not marker_applies(marker, environment):
+                    continue
+                dependency = normalize_package_name(name)
+                edges.setdefault(dependency, []).extend(specifiers)
+            self.forward[key] = edges
+            for dependency, specifiers in edges.items():
+                self.reverse[dependency][key] = specifiers
+
+    def name(self, key):
+        dist = self.packages.get(key)
+        return dist["name"] if dist else key
+
+    def dependencies(self, name, recursive=False):
+        return self._walk(self.forward, normalize_package_name(name), recursive)
+
+    def dependents(self, name, recursive=False):
+        return self._walk(self.reverse, normalize_package_name(name), recursive)
+
+    def _walk(self, index, start, recursive):
+        found = []
+        seen = {start}
+        frontier = [start]
+        while frontier:
+            key = frontier.pop()
+            for neighbour in sorted(index.get(key, {})):
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    found.append(neighbour)
+                    if recursive:
+                        frontier.append(neighbour)
+        return found
+
+    def problems(self):
+        """Return [(package, dependency, kind, detail)] for missing and conflicting requirements."""
+        problems = []
+        for key, edges in sorted(self.forward.items()):
+            for dependency, specifiers in sorted(edges.items()):
+                installed = self.packages.get(dependency)
+                if not installed:
+                    problems.append((key, dependency, "missing", "not installed"))
+                    continue
+                failed = [f"{op}{wanted}" for op, wanted in specifiers
+                          if not version_matches(installed["version"], op, wanted)]
+                if failed:
+                    problems.append((key, dependency, "conflict",
+                                     f"requires {','.join(failed)}, have {installed['version']}"))
+        return problems
+
+@timed_stage("dependency_graph")
+def get_dependency_graph(python_exec, refresh=False):
+    """Build the DependencyGraph of an interpreter, or None if it cannot be probed.
+
+    The interpreter is only spawned when its binary changes; afterwards each
+    sys.path directory is re-listed only when its mtime moves, and only the
+    dist-info entries whose metadata changed are parsed again.
+    """
+    resolved = shutil.which(python_exec)
+    if not resolved:
+        return None
+    real_path = os.path.realpath(resolved)
+    cache_key = interpreter_key(resolved)
+    signature = file_signature(real_path)
+    with DEPENDENCY_CACHE_LOCK:
+        cached = load_json_cache(DEPENDENCY_CACHE, {}).get(cache_key)
+    previous = cached
+    # Entries probed before every marker variable was collected are probed again
+    if (refresh or not cached or cached["signature"] != signature
+            or "platform_python_implementation" not in cached["environment"]):
+        try:
+            result = run_subprocess(
+                [resolved, "-c", PATH_PROBE],
+                capture_output=True,
+                text=True,
+                timeout=PACKAGE_PROBE_TIMEOUT
+            )
+            environment = json.loads(result.stdout)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            return None
+        cached = {"signature": signature, "environment": environment, "dirs": {}}
+    environment = cached["environment"]
+    dirs = {path: scan_distributions(path, cached["dirs"].get(path)) for path in environment["path"]}
+    if dirs != cached["dirs"] or previous is not cached:
+        cached["dirs"] = dirs
+        with DEPENDENCY_CACHE_LOCK:
+            cache = load_json_cache(DEPENDENCY_CACHE, {})
+            cache[cache_key] = cached
+            save_json_cache(DEPENDENCY_CACHE, cache)
+    distributions = []
+    for path in environment["path"]:
+        distributions.extend(dist for _, dist in sorted(dirs[path]["dists"].items()))
+    return DependencyGraph(distributions, environment)
+
+def warn_reverse_dependents(python_exec, package_name, log_name):
+    """Print the installed packages that require package_name; return their names."""
+    graph = get_dependency_graph(python_exec)
+    if graph is None:
+        return []
+    key = normalize_package_name(package_name)
+    direct = graph.dependents(key)
+    if not direct:
+        return []
+    indirect = [k for k in graph.dependents(key, recursive=True) if k not in direct]
+    lines = [f"⚠️ {len(direct)} installed package(s) depend on '{package_name}':"]
+    for dependent in direct:
+        specifiers = ",".join(op + v for op, v in graph.reverse[key][dependent])
+        lines.append(f"  - {graph.name(dependent)} {graph.packages[dependent]['version']} (requires {package_name}{specifiers})")
+    if indirect:
+        lines.append(f"  Also affected through them: {', '.join(graph.name(k) for k in indirect)}")
+    message = "\n".join(lines)
+    print(Fore.YELLOW + message)
+    log_action(log_name, f"Reverse dependents of {package_name} for {python_exec}", message)
+    return [graph.name(k) for k in direct]
+
+def check_dependencies(version):
+    python_exec = python_command(version)
+    graph = get_dependency_graph(python_exec)
+    if graph is None:
+        result = f"Could not read dependency metadata for Python {version}."
+        print(Fore.RED + result)
+        log_action("check_dependencies", f"Dependency check failed for Python {version}", result)
+        return
+    problems = graph.problems()
+    edges = sum(len(e) for e in graph.forward.values())
+    lines = [f"{len(graph.packages)} distributions, {edges} dependency edges."]
+    if problems:
+        lines += [f"{graph.name(p)} -> {d}: {kind} ({detail})" for p, d, kind, detail in problems]
+    else:
+        lines.append("No broken or conflicting requirements found.")
+    result = "\n".join(lines)
+    print((Fore.YELLOW if problems else Fore.GREEN) + result)
+
+    package = input(Fore.CYAN + "\nShow dependencies of a package (name, or Enter to skip): ").strip()
+    if package:
+        if normalize_package_name(package) not in graph.packages:
+            print(Fore.RED + f"'{package}' is not installed for Python {version}.")
+        else:
+            requires = [graph.name(k) for k in graph.dependencies(package, recursive=True)]
+            required_by = [graph.name(k) for k in graph.dependents(package, recursive=True)]
+            detail = (f"{package} requires (transitively): {', '.join(requires) or 'nothing'}\n"
+                      f"{package} is required by (transitively): {', '.join(required_by) or 'nothing'}")
+            print(Fore.GREEN + detail)
+            result += "\n" + detail
+    log_action("check_dependencies", f"Checked dependency graph for Python {version}", result)
+
+def version_sort_key(version):
+    """Rough PEP 440 ordering: dev < pre-releases < release < post-releases."""
+    key = []
+    for part in re.findall(r"\d+|[a-z]+", version.lower()):
+        if part.isdigit():
+            key.append((int(part), ""))
+        elif part in ("post", "rev", "r"):
+            key.append((0, part))
+        else:
+            key.append((-2 if part == "dev" else -1, part))
+    key.append((0, ""))
+    return key
+
+def parse_distribution_filename(filename):
+    """Return (name, version) for a wheel or sdist filename, or None."""
+    if filename.endswith(".whl"):
+        parts = filename[:-4].split("-")
+        return (parts[0], parts[1]) if len(parts) >= 5 else None
+    for ext in (".tar.gz", ".tar.bz2", ".zip"):
+        if filename.endswith(ext):
+            name, _, version = filename[:-len(ext)].rpartition("-")
+            return (name, version) if name and version else None
+    return None
+
+def scan_local_index(index_dir):
+    """Return {normalized name: [versions]} from a wheelhouse or simple-index directory."""
+    found = {}
+    index_dir = Path(index_dir)
+    # Flat wheelhouse files plus one level of <project>/ simple-index directories
+    candidates = list(index_dir.iterdir()) if index_dir.is_dir() else []
+    for entry in list(candidates):
+        if entry.is_dir():
+            candidates.extend(entry.iterdir())
+    for entry in candidates:
+        if entry.is_dir():
+            continue
+        names = [entry.name]
+        if entry.name == "index.html":
+            names = re.findall(r'href="(?:[^"#]*/)?([^"/#]+)', entry.read_text(errors="replace"))
+        for name in names:
+            parsed = parse_distribution_filename(name)
+            if parsed:
+                found.setdefault(normalize_package_name(parsed[0]), set()).add(parsed[1])
+    return {name: sorted(versions, key=version_sort_key, reverse=True) for name, versions in found.items()}
+
+def fetch_pip_versions(python_exec, package):
+    """Ask pip for available versions; return (versions, error)."""
+    try:
+        result = run_subprocess(
+            [python_exec, "-m", "pip", "index", "versions", package],
+            capture_output=True,
+            text=True
+        )
+    except OSError as e:
+        return None, str(e)
+    output = (result.stdout + result.stderr).strip()
+    for line in result.stdout.splitlines():
+        if line.startswith("Available versions:"):
+            return [v.strip() for v in line.split(":", 1)[1].split(",") if v.strip()], None
+    if "No matching distribution found" in output:
+        return [], None
+    return None, output
+
+def version_index_key(python_exec):
+    """Cache key for an interpreter, so "python3.11" and "/usr/bin/python3.11" share one entry."""
+    return interpreter_key(shutil.which(python_exec) or python_exec)
+
+def refresh_version_index(python_exec, packages):
+    """Refresh cached available versions for many packages at once; return {name: error}."""
+    cache = load_json_cache(PYPI_INDEX_CACHE, {})
+    entries = cache.setdefault(version_index_key(python_exec), {})
+    now = time.time()
+    errors = {}
+    if LOCAL_PACKAGE_INDEX:
+        local = scan_local_index(LOCAL_PACKAGE_INDEX)
+        for package in packages:
+            name = normalize_package_name(package)
+            entries[name] = {"versions": local.get(name, []), "fetched": now, "source": "local"}
+    elif packages:
+        with ThreadPoolExecutor(max_workers=min(PYPI_REFRESH_WORKERS, len(packages))) as pool:
+            results = pool.map(lambda p: fetch_pip_versions(python_exec, p), packages)
+            for package, (versions, error) in zip(packages, results):
+                if versions is None:
+                    errors[package] = error
+                    continue
+                entries[normalize_package_name(package)] = {"versions": versions, "fetched": now, "source": "pip"}
+    save_json_cache(PYPI_INDEX_CACHE, cache)
+    return errors
+
+def get_available_versions(python_exec, package, refresh=False, wanted=None):
+    """Return (versions newest first, error) from the version-index cache, refreshing it when stale.
+
+    A cached entry that lacks the `wanted` version is refreshed once, since
+    that version may have been published after the entry was fetched.
+    """
+    name = normalize_package_name(package)
+    key = version_index_key(python_exec)
+    if not refresh:
+        entry = load_json_cache(PYPI_INDEX_CACHE, {}).get(key, {}).get(name)
+        if (entry and time.time() - entry["fetched"] < PYPI_CACHE_TTL
+                and (wanted is None or wanted in entry["versions"])):
+            return entry["versions"], None
+    errors = refresh_version_index(python_exec, [package])
+    if package in errors:
+        return None, errors[package]
+    entry = load_json_cache(PYPI_INDEX_CACHE, {}).get(key, {}).get(name)
+    return (entry["versions"], None) if entry else (None, "Version index cache could not be written.")
+
+def format_available_versions(package, versions):
+    """Render versions like the output of pip index versions."""
+    return f"{package} ({versions[0]})\nAvailable versions: {', '.join(versions)}"
+
+def refresh_pypi_cache(version):
+    answer = input(Fore.CYAN + "Enter package names to refresh (space or comma separated, blank for all installed): ")
+    packages = [p for p in re.split(r"[,\s]+", answer) if p]
+    if not packages:
+        installed = get_installed_packages(python_command(version)) or {}
+        packages = sorted(p["name"] for p in installed.values())
+    if not packages:
+        print(Fore.RED + "No packages to refresh.")
+        return
+
+    source = LOCAL_PACKAGE_INDEX or "pip index"
+    print(Fore.YELLOW + f"Refreshing available versions of {len(packages)} packages from {source}...")
+    errors = refresh_version_index(python_command(version), packages)
+    output = f"Refreshed {len(packages) - len(errors)} of {len(packages)} packages from {source}."
+    for package, error in errors.items():
+        output += f"\n{package}: {error}"
+    print((Fore.RED if errors else Fore.GREEN) + output)
+    log_action("refresh_pypi_cache", f"Refreshed version index for Python {version}", output)
+
 def list_installed_packages(version):
     print()
-    result = subprocess.getoutput(f"python{version} -m pip list")
+    packages = get_installed_packages(python_command(version))
+    if packages is None:
+        result = f"Could not read package metadata for Python {version}."
+        print(Fore.RED + result)
+        log_action("list_installed_packages", f"Failed to list pip packages for Python {version}", result)
+        return
+    rows = sorted(((p["name"], p["version"]) for p in packages.values()), key=lambda r: r[0].lower())
+    width = max([len("Package")] + [len(name) for name, _ in rows])
+    lines = [f"{'Package'.ljust(width)} Version", f"{'-' * width} -------"]
+    lines += [f"{name.ljust(width)} {pkg_version}" for name, pkg_version in rows]
+    result = "\n".join(lines)
     print(Fore.GREEN + result)
     log_action("list_installed_packages", f"Listed pip packages for Python {version}", result)
 
+def path_mtimes(paths):
+    """Return {path: mtime_ns or None} used to detect changes on sys.path."""
+    mtimes = {}
+    for path in paths:
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            mtimes[path] = None
+    return mtimes
+
+def get_installed_modules(python_exec, refresh=False):
+    """Return top-level modules of an interpreter, cached until its sys.path directories change."""
+    resolved = shutil.which(python_exec)
+    if not resolved:
+        return None
+    real_path = os.path.realpath(resolved)
+    # A venv's python links to the base binary, so run it through the link and key it by prefix
+    cache_key = interpreter_key(resolved)
+    signature = file_signature(real_path)
+    cache = load_json_cache(MODULE_CACHE, {})
+    cached = cache.get(cache_key)
+    if (not refresh and cached and cached["signature"] == signature
+            and path_mtimes(cached["dirs"]) == cached["dirs"]):
+        return cached["modules"]
+
+    try:
+        result = run_subprocess(
+            [resolved, "-c", MODULE_PROBE],
+            capture_output=True,
+            text=True,
+            timeout=PACKAGE_PROBE_TIMEOUT
+        )
+        data = json.loads(result.stdout)
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        return None
+    cache[cache_key] = {
+        "signature": signature,
+        "dirs": path_mtimes(data["path"]),
+        "modules": data["modules"],
+    }
+    save_json_cache(MODULE_CACHE, cache)
+    return data["modules"]
+
 def list_installed_modules(version):
     print()
-    result = subprocess.getoutput(f'python{version} -c "help(\'modules\')"')
+    modules = get_installed_modules(python_command(version))
+    if modules is None:
+        result = f"Could not list modules for Python {version}."
+        print(Fore.RED + result)
+        log_action("list_installed_modules", f"Failed to list modules for Python {version}", result)
+        return
+
+    lines = []
+    for origin in ("builtin", "stdlib", "site-packages", "other"):
+        names = sorted(
+            m["name"] + ("/" if m["package"] else "") + (" (extension)" if m["extension"] else "")
+            for m in modules if m["origin"] == origin
+        )
+        if names:
+            lines.append(f"[{origin}] {len(names)} modules")
+            lines.extend(f"  {name}" for name in names)
+    result = "\n".join(lines)
     print(Fore.GREEN + result)
     log_action("list_installed_modules", f"Listed modules for Python {version}", result)
 
+SNAPSHOT_LOCK = threading.Lock()
+
+def requirement_line(package):
+    """The line pip freeze writes for a package.
+
+    Packages installed from a URL, a VCS or in editable mode (PEP 610
+    direct_url.json) keep that source, followed by a "# name==version"
+    comment that pip ignores and load_snapshot reads back.
+    """
+    pin = f"{package['name']}=={package['version']}"
+    direct_url = package.get("direct_url")
+    if not direct_url or "url" not in direct_url:
+        return pin
+    url = direct_url["url"]
+    if direct_url.get("dir_info", {}).get("editable") and url.startswith("file://"):
+        return f"-e {urllib.parse.unquote(url[len('file://'):])}  # {pin}"
+    vcs_info = direct_url.get("vcs_info")
+    if vcs_info:
+        revision = vcs_info.get("commit_id") or vcs_info.get("requested_revision")
+        url = f"{vcs_info['vcs']}+{url}" + (f"@{revision}" if revision else "")
+    fragments = []
+    archive_hash = direct_url.get("archive_info", {}).get("hash")
+    if archive_hash:
+        fragments.append(archive_hash)
+    if direct_url.get("subdirectory"):
+        fragments.append(f"subdirectory={direct_url['subdirectory']}")
+    if fragments:
+        url += "#" + "&".join(fragments)
+    if direct_url.get("dir_info", {}).get("editable"):
+        return f"-e {url}  # {pin}"
+    return f"{package['name']} @ {url}  # {pin}"
+
+def snapshot_requirements(packages):
+    """Canonical, sorted requirement lines for a package set."""
+    return sorted((requirement_line(p) for p in packages.values()), key=lambda line: line.lower())
+
+def freeze_excludes(version_output):
+    """Packages pip freeze leaves out for an interpreter, from its `--version` output."""
+    match = re.search(r"(\d+)\.(\d+)", version_output or "")
+    if match and (int(match.group(1)), int(match.group(2))) >= (3, 12):
+        return FREEZE_EXCLUDES
+    return FREEZE_EXCLUDES | FREEZE_BUILD_BACKENDS
+
+@timed_stage("snapshot")
+def take_snapshot(python_exec):
+    """Record an interpreter's package set; returns (hash, is_new) or (None, False) on failure.
+
+    Package sets are stored once under their SHA-256, and an interpreter's
+    history only grows when its set actually changed.
+    """
+    packages = get_installed_packages(python_exec)
+    if packages is None:
+        return None, False
+    lines = snapshot_requirements(packages)
+    digest = hashlib.sha256("\n".join(lines).encode()).hexdigest()
+    objects = SNAPSHOT_DIR / "objects"
+    objects.mkdir(parents=True, exist_ok=True)
+    object_file = objects / f"{digest}.json"
+    if not object_file.exists():
+        save_json_cache(object_file, lines)
+
+    with SNAPSHOT_LOCK:
+        index = load_json_cache(SNAPSHOT_INDEX, {})
+        key = interpreter_key(shutil.which(python_exec) or python_exec)
+        history = index.setdefault(key, [])
+        if history and history[-1]["hash"] == digest:
+            return digest, False
+        history.append({
+            "hash": digest,
+            "taken": datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "python": python_exec,
+            "version": probe_python_version(python_exec),
+            "packages": len(lines),
+        })
+        save_json_cache(SNAPSHOT_INDEX, index)
+    return digest, True
+
+def load_snapshot(ref):
+    """Return (hash, {normalized name: (name, version, requirement line)}) for a full or abbreviated hash."""
+    matches = [p for p in (SNAPSHOT_DIR / "objects").glob(f"{ref}*.json")] if len(ref) >= 6 else []
+    if len(matches) != 1:
+        return None, None
+    lines = load_json_cache(matches[0], [])
+    packages = {}
+    for line in lines:
+        name, _, version = line.rpartition("  # ")[2].partition("==")
+        packages[normalize_package_name(name)] = (name, version, line)
+    return matches[0].stem, packages
+
+def snapshot_python_version(digest):
+    """The `--version` output recorded with a snapshot, or None for snapshots taken before it was."""
+    for history in load_json_cache(SNAPSHOT_INDEX, {}).values():
+        for entry in history:
+            if entry["hash"] == digest and entry.get("version"):
+                return entry["version"]
+    return None
+
+def latest_snapshot(python_exec):
+    key = interpreter_key(shutil.which(python_exec) or python_exec)
+    history = load_json_cache(SNAPSHOT_INDEX, {}).get(key)
+    return history[-1]["hash"] if history else None
+
+def diff_snapshots(old, new):
+    """Set-based diff of two load_snapshot maps: (added, removed, changed).
+
+    A package whose version stayed the same but whose source (URL, commit,
+    editable) moved counts as changed and shows both requirement lines.
+    """
+    added = sorted(new[n][2] for n in new.keys() - old.keys())
+    removed = sorted(old[n][2] for n in old.keys() - new.keys())
+    changed = sorted(
+        f"{new[n][0]}: {old[n][1]} -> {new[n][1]}" if old[n][1] != new[n][1]
+        else f"{new[n][0]}: {old[n][2]} -> {new[n][2]}"
+        for n in old.keys() & new.keys() if old[n][2] != new[n][2]
+    )
+    return added, removed, changed
+
+def format_snapshot_diff(added, removed, changed):
+    if not (added or removed or changed):
+        return "No differences."
+    lines = [f"+ {line}" for line in added]
+    lines += [f"- {line}" for line in removed]
+    lines += [f"~ {line}" for line in changed]
+    return "\n".join(lines)
+
+def export_snapshot(packages, output_path, version_output=None):
+    """Write a snapshot as a requirements file, leaving out what pip freeze leaves out on that Python."""
+    excludes = freeze_excludes(version_output)
+    with open(output_path, "w") as f:
+        for name in sorted(packages, key=str.lower):
+            if name not in excludes:
+                f.write(packages[name][2] + "\n")
+
 def generate_requirements(version):
-    output_path = Path(f"./requirements_python{version}.txt")
-    os.system(f"python{version} -m pip freeze > {output_path}")
+    output_path = Path(f"./requirements_python{re.sub(r'[^A-Za-z0-9.]+', '_', version).strip('_')}.txt")
+    digest, is_new = take_snapshot(python_command(version))
+    if not digest:
+        print(Fore.RED + f"\nCould not read installed packages for Python {version}.")
+        log_action("generate_requirements", f"Failed to generate requirements.txt for Python {version}")
+        return
+    _, packages = load_snapshot(digest)
+    export_snapshot(packages, output_path, probe_python_version(python_command(version)))
     with open(output_path) as f:
         content = f.read()
     print(Fore.GREEN + f"\nrequirements.txt generated at: {output_path}\n")
     print(content)
-    log_action("generate_requirements", f"Generated requirements.txt for Python {version}", content)
+    state = "new snapshot" if is_new else "unchanged since last snapshot"
+    print(Fore.YELLOW + f"Snapshot {digest[:12]} ({state})")
+    log_action("generate_requirements", f"Generated requirements.txt for Python {version} from snapshot {digest[:12]}", content)
 
-def search_module(version):
-    module = input(Fore.CYAN + "Enter module name to search: ").strip()
-    try:
-        # Check if installed
-        output = subprocess.check_output(
-            [f"python{version}", "-m", "pip", "show", module],
-            stderr=subprocess.DEVNULL
-        ).decode().strip()
+def snapshot_all_interpreters():
+    interpreters = discover_interpreters()
+    if not interpreters:
+        print(Fore.RED + "No Python 3.x versions found.")
+        return
+    output = ""
+    with ThreadPoolExecutor(max_workers=min(PROBE_WORKERS, len(interpreters))) as pool:
+        futures = {pool.submit(take_snapshot, path): path for _, path in interpreters}
+        for future in as_completed(futures):
+            digest, is_new = future.result()
+            if digest:
+                line = f"{futures[future]}: {digest[:12]} ({'new' if is_new else 'unchanged'})"
+                print((Fore.GREEN if is_new else Fore.YELLOW) + line)
+            else:
+                line = f"{futures[future]}: failed to read packages"
+                print(Fore.RED + line)
+            output += line + "\n"
+    log_action("snapshots", "Took snapshots of all interpreters", output.strip())
 
-        if output:
-            print(Fore.GREEN + f"Module '{module}' is already installed for Python {version}.")
-            log_action("search_module", f"Module '{module}' FOUND (installed) for Python {version}")
-            return
-    except subprocess.CalledProcessError:
-        pass  # Not installed, move on to checking availability
+def list_snapshots():
+    index = load_json_cache(SNAPSHOT_INDEX, {})
+    if not index:
+        print(Fore.YELLOW + "No snapshots yet.")
+        return
+    for key in sorted(index):
+        print(Fore.GREEN + f"\n[{key}]")
+        for entry in index[key]:
+            print(Fore.YELLOW + f"- {entry['hash'][:12]}  {entry['taken']}  {entry['packages']} packages  ({entry['python']})")
 
-    print(Fore.YELLOW + f"Module '{module}' is not installed. Checking availability on PyPI...")
+def diff_snapshot_refs():
+    first = input(Fore.CYAN + "Enter first snapshot hash (at least 6 characters): ").strip()
+    second = input(Fore.CYAN + "Enter second snapshot hash (at least 6 characters): ").strip()
+    first_hash, old = load_snapshot(first)
+    second_hash, new = load_snapshot(second)
+    if old is None or new is None:
+        print(Fore.RED + "Snapshot not found or hash prefix is ambiguous.")
+        return
+    result = format_snapshot_diff(*diff_snapshots(old, new))
+    print(Fore.GREEN + f"\n{first_hash[:12]} -> {second_hash[:12]}:\n")
+    print(result)
+    log_action("snapshots", f"Diffed snapshots {first_hash[:12]} and {second_hash[:12]}", result)
 
-    try:
-        output = subprocess.check_output(
-            [f"python{version}", "-m", "pip", "index", "versions", module],
-            stderr=subprocess.STDOUT
-        ).decode()
+def diff_interpreters():
+    first = input(Fore.CYAN + "Enter first Python version or interpreter path: ").strip()
+    second = input(Fore.CYAN + "Enter second Python version or interpreter path: ").strip()
+    snapshots = []
+    for target in (first, second):
+        python_exec = resolve_python_executable(target)
+        if not python_exec:
+            print(Fore.RED + f"Python {target} not found.")
+            return
+        # Drift checks use stored snapshots; only interpreters never snapshotted are probed
+        digest = latest_snapshot(python_exec) or take_snapshot(python_exec)[0]
+        if not digest:
+            print(Fore.RED + f"Could not read installed packages for {python_exec}.")
+            return
+        snapshots.append(load_snapshot(digest)[1])
+    result = format_snapshot_diff(*diff_snapshots(*snapshots))
+    print(Fore.GREEN + f"\n{first} -> {second} (latest snapshots):\n")
+    print(result)
+    log_action("snapshots", f"Diffed latest snapshots of {first} and {second}", result)
+
+def export_snapshot_ref():
+    ref = input(Fore.CYAN + "Enter snapshot hash (at least 6 characters): ").strip()
+    digest, packages = load_snapshot(ref)
+    if packages is None:
+        print(Fore.RED + "Snapshot not found or hash prefix is ambiguous.")
+        return
+    output_path = Path(f"./requirements_{digest[:12]}.txt")
+    export_snapshot(packages, output_path, snapshot_python_version(digest))
+    print(Fore.GREEN + f"Exported snapshot {digest[:12]} to {output_path}")
+    log_action("snapshots", f"Exported snapshot {digest[:12]} to {output_path}")
 
-        if "Available versions" in output:
-            print(Fore.GREEN + f"{output}")
-            log_action("search_module", f"Module '{module}' AVAILABLE (not installed) for Python {version}")
+def snapshots_menu():
+    while True:
+        print(Fore.YELLOW + """
+Environment Snapshots
+-------------------------------------------
+1. Snapshot all interpreters
+2. List snapshots
+3. Diff two snapshots
+4. Diff two interpreters
+5. Export a snapshot to requirements.txt
+6. Back to main menu
+""")
+        choice = input(Fore.GREEN + "Enter your choice: ")
+        if choice == "1":
+            snapshot_all_interpreters()
+        elif choice == "2":
+            list_snapshots()
+        elif choice == "3":
+            diff_snapshot_refs()
+        elif choice == "4":
+            diff_interpreters()
+        elif choice == "5":
+            export_snapshot_ref()
+        elif choice == "6":
+            break
         else:
-            print(Fore.RED + f"Module '{module}' not found on PyPI for Python {version}.")
-            log_action("search_module", f"Module '{module}' NOT found (PyPI) for Python {version}")
-    except subprocess.CalledProcessError as e:
-        print(Fore.RED + f"Error checking module availability: {e.output.decode().strip()}")
+            print(Fore.RED + "Invalid choice. Please try again.")
+
+def search_module(version):
+    module = input(Fore.CYAN + "Enter module name to search: ").strip()
+    # Check if installed
+    packages, error = probe_packages(python_command(version))
+    if packages is None:
+        print(Fore.RED + f"Could not read installed packages for Python {version}: {error}")
+        log_action("search_module", f"Package probe failed for Python {version}", error)
+        return
+    if find_package(packages, module):
+        print(Fore.GREEN + f"Module '{module}' is already installed for Python {version}.")
+        log_action("search_module", f"Module '{module}' FOUND (installed) for Python {version}")
+        return
+
+    print(Fore.YELLOW + f"Module '{module}' is not installed. Checking availability on PyPI...")
+
+    versions, error = get_available_versions(python_command(version), module)
+    if error:
+        print(Fore.RED + f"Error checking module availability: {error}")
         log_action("search_module", f"Error checking module '{module}' for Python {version}")
+    elif versions:
+        print(Fore.GREEN + format_available_versions(module, versions))
+        log_action("search_module", f"Module '{module}' AVAILABLE (not installed) for Python {version}")
+    else:
+        print(Fore.RED + f"Module '{module}' not found on PyPI for Python {version}.")
+        log_action("search_module", f"Module '{module}' NOT found (PyPI) for Python {version}")
 
 def install_module(version):
     module = input(Fore.CYAN + "Enter module name to install: ")
     print(Fore.YELLOW + f"Checking availability of module '{module}' for Python {version}...")
-    # Use pip search index; handle errors more gracefully
-    check = subprocess.getoutput(f"python{version} -m pip index versions {module} 2>&1")
-    if "ERROR" in check or "WARNING" in check:
+    versions, error = get_available_versions(python_command(version), module)
+    if not versions:
         print(Fore.RED + f"Module '{module}' not found in pip index or not available.")
-        log_action("install_module", f"Failed to locate module {module} for Python {version}", check)
+        log_action("install_module", f"Failed to locate module {module} for Python {version}", error or "")
         return
 
+    check = format_available_versions(module, versions)
     print(Fore.GREEN + check)
     confirm = input(Fore.CYAN + f"Install '{module}' for Python {version}? (y/n): ")
     if confirm.lower() == 'y':
-        result = subprocess.getoutput(f"python{version} -m pip install {module}")
-        print(Fore.GREEN + result)
-        log_action("install_module", f"Installed module {module} in Python {version}", result)
+        run_command(
+            [python_command(version), "-m", "pip", "install", module],
+            "install_module",
+            f"Installed module {module} in Python {version}"
+        )
 
-def search_installed_module():
-    module = input(Fore.CYAN + "Enter module name to search (installed only): ").strip()
-    found_versions = []
+def probe_installed_packages(interpreters, timeout=SEARCH_TIMEOUT):
+    """Yield (name, path, packages) for each interpreter as its probe finishes; packages is None on failure."""
+    # Every interpreter is probed once for all modules; results print as each one finishes.
+    # The stage is timed inside the generator so it covers the probes, not just its creation.
+    with timed_stage("module_search"), ThreadPoolExecutor(max_workers=min(PROBE_WORKERS, len(interpreters))) as pool:
+        futures = {
+            pool.submit(get_installed_packages, path, timeout): (name, path)
+            for name, path in interpreters
+        }
+        for future in as_completed(futures):
+            name, path = futures[future]
+            yield name, path, future.result()
 
-    # Look for all python3.x binaries
-    python_binaries = sorted(glob.glob("/usr/bin/python3.*"))
+def search_installed_module():
+    answer = input(Fore.CYAN + "Enter module name(s) to search (installed only, space or comma separated): ")
+    modules = [m for m in re.split(r"[,\s]+", answer) if m]
+    if not modules:
+        print(Fore.RED + "No module name given.")
+        return
 
-    if not python_binaries:
+    warm = daemon_query("which", packages=modules, path=os.environ["PATH"])
+    interpreters = [(e["name"], e["path"]) for e in warm] if warm is not None else discover_interpreters()
+    if not interpreters:
         print(Fore.RED + "No Python 3.x versions found.")
         return
 
-    print(Fore.YELLOW + f"\nChecking if module '{module}' is installed in the following Python versions:")
+    print(Fore.YELLOW + f"\nChecking if {', '.join(repr(m) for m in modules)} installed in {len(interpreters)} Python versions:")
+    found_versions = {module: [] for module in modules}
 
-    for python_bin in python_binaries:
-        version = python_bin.split("/")[-1]
-        if not shutil.which(python_bin):
+    if warm is not None:
+        results = [(e["name"], e["path"], e["packages"]) for e in warm]
+    else:
+        results = probe_installed_packages(interpreters)
+    for version, path, packages in results:
+        if packages is None:
+            print(Fore.RED + f"\n⚠ {version} ({path}) could not be checked (failed or timed out after {SEARCH_TIMEOUT}s).")
             continue
+        for module in modules:
+            package = find_package(packages, module)
+            if package:
+                print(Fore.GREEN + f"\n✔ Module '{module}' is INSTALLED for {version} ({path}):")
+                print(format_package_info(package))
+                found_versions[module].append(f"{version} ({path})")
+            else:
+                print(Fore.RED + f"✘ Module '{module}' is NOT installed for {version} ({path}).")
 
-        try:
-            output = subprocess.check_output(
-                [python_bin, "-m", "pip", "show", module],
-                stderr=subprocess.DEVNULL
-            ).decode().strip()
-
-            if output:
-                print(Fore.GREEN + f"\n✔ Module '{module}' is INSTALLED for {version}:")
-                print(output)
-                found_versions.append(version)
-        except subprocess.CalledProcessError:
-            print(Fore.RED + f"✘ Module '{module}' is NOT installed for {version}.")
-
-    if not found_versions:
-        log_action("search_installed_module", f"Module '{module}' not installed in any Python version.")
-    else:
-        log_action("search_installed_module", f"Module '{module}' installed in: {', '.join(found_versions)}")
+    for module, versions in found_versions.items():
+        if not versions:
+            log_action("search_installed_module", f"Module '{module}' not installed in any Python version.")
+        else:
+            log_action("search_installed_module", f"Module '{module}' installed in: {', '.join(sorted(versions))}")
 
 def uninstall_module(version):
     module = input(Fore.CYAN + "Enter module name to uninstall: ")
-    installed = subprocess.getoutput(f"python{version} -m pip show {module}")
-    if not installed or "Name:" not in installed:
+    packages, error = probe_packages(python_command(version))
+    if packages is None:
+        print(Fore.RED + f"Could not read installed packages for Python {version}: {error}")
+        log_action("uninstall_module", f"Package probe failed for Python {version}", error)
+        return
+    package = find_package(packages, module)
+    if not package:
         print(Fore.RED + f"Module '{module}' is NOT installed in Python {version}")
-        log_action("uninstall_module", f"Attempted to uninstall non-existent module {module} in Python {version}", installed)
+        log_action("uninstall_module", f"Attempted to uninstall non-existent module {module} in Python {version}")
         return
 
+    installed = format_package_info(package)
     print(Fore.GREEN + f"Module '{module}' is installed.\n{installed}")
+    warn_reverse_dependents(python_command(version), package["name"], "uninstall_module")
     confirm = input(Fore.CYAN + f"Uninstall '{module}' from Python {version}? (y/n): ")
     if confirm.lower() == 'y':
-        result = subprocess.getoutput(f"python{version} -m pip uninstall -y {module}")
-        print(Fore.GREEN + result)
-        log_action("uninstall_module", f"Uninstalled module {module} from Python {version}", result)
+        run_command(
+            [python_command(version), "-m", "pip", "uninstall", "-y", module],
+            "uninstall_module",
+            f"Uninstalled module {module} from Python {version}"
+        )
 
-def view_logs():
-    print(Fore.CYAN + "\nAvailable Log Files (Grouped by Function):\n")
-    logs = ""
+def legacy_action_name(filename):
+    parts = filename.replace(".log", "").split("_")
+
+    # Extract full function name by excluding last parts that are timestamps
+    # e.g., list_installed_packages_20250520_10_30_45 -> list_installed_packages
+    return "_".join(parts[:-4]) if len(parts) >= 5 else "_".join(parts[:-1])
 
+def legacy_log_files():
+    """Group the old one-file-per-action *.log files by function name."""
     log_files_by_function = {}
 
     for file in sorted(LOG_DIR.glob("*.log")):
-        filename = file.name
-        parts = filename.replace(".log", "").split("_")
-
-        # Extract full function name by excluding last parts that are timestamps
-        # e.g., list_installed_packages_20250520_10_30_45 -> list_installed_packages
-        func_name = "_".join(parts[:-3]) if len(parts) >= 4 else "_".join(parts[:-1])
+        func_name = legacy_action_name(file.name)
 
         if func_name not in log_files_by_function:
             log_files_by_function[func_name] = []
         log_files_by_function[func_name].append(file)
+    return log_files_by_function
 
+@timed_stage("log_listing")
+def view_logs():
+    print(Fore.CYAN + "\nLogged Actions (Grouped by Function):\n")
+    logs = ""
+
+    actions = LOG_STORE.actions()
+    for func_name in sorted(actions):
+        info = actions[func_name]
+        line = f"{info['count']} entries, {info['first']} -> {info['last']}"
+        print(Fore.GREEN + f"\n[{func_name}]")
+        print(Fore.YELLOW + f"- {line}")
+        logs += f"[{func_name}]\n- {line}\n"
+
+    log_files_by_function = legacy_log_files()
+    if log_files_by_function:
+        print(Fore.CYAN + "\nLegacy Log Files (Grouped by Function):\n")
     for func_name in sorted(log_files_by_function):
         print(Fore.GREEN + f"\n[{func_name}]")
         logs += f"[{func_name}]\n"
@@ -277,42 +2168,409 @@ def view_logs():
             print(Fore.YELLOW + f"- {log_file}")
             logs += f"- {log_file}\n"
 
-    log_action("view_logs", "Viewed log files grouped by function name.", logs.strip())
+    archived = archived_log_summary()
+    if archived:
+        print(Fore.CYAN + "\nArchived Legacy Log Files (Grouped by Function):\n")
+    for func_name in sorted(archived):
+        print(Fore.GREEN + f"\n[{func_name}]")
+        logs += f"[{func_name}]\n"
+        for archive, info in sorted(archived[func_name].items()):
+            line = f"{info['count']} files, {info['first']} -> {info['last']} in {ARCHIVE_DIR / archive}"
+            print(Fore.YELLOW + f"- {line}")
+            logs += f"- {line}\n"
+
+    log_action("view_logs", "Viewed log files grouped by function name.", logs.strip())
+
+def read_log_lines(source):
+    """Return the text lines of an action in the log store or of a legacy log file."""
+    filepath = LOG_DIR / source
+    if source.endswith(".log") and filepath.is_file():
+        with open(filepath) as f:
+            return f.read().splitlines(keepends=True)
+    manifest = load_json_cache(ARCHIVE_MANIFEST, {"archives": {}})
+    if source in manifest["archives"]:
+        lines = []
+        for entry in iter_archive_entries(ARCHIVE_DIR / source):
+            lines.append(f"===== {entry['file']} =====\n")
+            lines.extend(entry["content"].splitlines(keepends=True))
+        return lines
+    if source.endswith(".log"):
+        for archive, info in manifest["archives"].items():
+            if any(e["file"] == source for e in info["entries"]):
+                for entry in iter_archive_entries(ARCHIVE_DIR / archive):
+                    if entry["file"] == source:
+                        return entry["content"].splitlines(keepends=True)
+    if source in LOG_STORE.actions():
+        lines = []
+        for record in LOG_STORE.records(action=source):
+            lines.extend(format_log_record(record).splitlines(keepends=True))
+        return lines
+    return None
+
+def legacy_log_timestamp(file):
+    """Return the 'YYYY-mm-dd HH:MM:SS' timestamp encoded in a legacy log filename."""
+    parts = Path(file).name.replace(".log", "").split("_")
+    try:
+        stamp = datetime.datetime.strptime("_".join(parts[-4:]), "%Y%m%d_%H_%M_%S")
+    except ValueError:
+        return None
+    return stamp.strftime('%Y-%m-%d %H:%M:%S')
+
+def raw_prefilter_safe(regex):
+    """True if a pattern is a plain literal that reads the same inside a JSON-encoded record.
+
+    Metacharacters such as . or \\W can match characters that JSON escaping
+    rewrites, so any pattern using them is checked against decoded records only.
+    """
+    return not re.search(r'[.^$*+?{}\[\]\\|()"]|[\x00-\x1f]', regex)
+
+def iter_matching_lines(text, pattern):
+    """Yield (line number, line) for every line of text that the pattern matches."""
+    pos = 0
+    lineno = 1
+    counted = 0
+    while True:
+        match = pattern.search(text, pos)
+        if not match:
+            return
+        start = text.rfind("\n", 0, match.start()) + 1
+        end = text.find("\n", match.start())
+        end = len(text) if end == -1 else end
+        lineno += text.count("\n", counted, start)
+        counted = start
+        line = text[start:end]
+        # A match spanning a newline is only a candidate; confirm on the line itself
+        if pattern.search(line):
+            yield lineno, line
+        pos = end + 1
+        if pos > len(text):
+            return
+
+def read_mapped_text(path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[:].decode(errors="replace")
+
+def match_text_lines(text, pattern, label, context, limit, results):
+    """Append line matches in plain text to results; return False once the limit is reached."""
+    lines = None
+    for lineno, line in iter_matching_lines(text, pattern):
+        if lines is None:
+            lines = text.split("\n")
+        results.append({
+            "file": label,
+            "line": lineno,
+            "text": line,
+            "before": lines[max(0, lineno - 1 - context):lineno - 1],
+            "after": lines[lineno:lineno + context],
+        })
+        if limit and len(results) >= limit:
+            return False
+    return True
+
+def scan_log_file(path, regex, flags, kind, action, since, until, context, limit):
+    """Scan one log file in bulk and return its matches with surrounding context.
+
+    kind is "legacy" for an old per-action file, "archive" for a compacted
+    archive and "segment" for a log store segment.
+    """
+    pattern = re.compile(regex, flags)
+    results = []
+    if kind == "legacy":
+        match_text_lines(read_mapped_text(path), pattern, str(path), context, limit, results)
+        return results
+    if kind == "archive":
+        for entry in iter_archive_entries(path):
+            if action and action not in (entry["action"], entry["file"]):
+                continue
+            if since and entry["timestamp"] < since:
+                continue
+            if until and entry["timestamp"] > until:
+                continue
+            if not match_text_lines(entry["content"], pattern, f"{path}:{entry['file']}", context, limit, results):
+                break
+        return results
+
+    text = read_mapped_text(path)
+
+    if raw_prefilter_safe(regex):
+        candidates = iter_matching_lines(text, pattern)
+    else:
+        candidates = enumerate(text.split("\n"), start=1)
+    for lineno, raw in candidates:
+        try:
+            record = json.loads(raw)
+        except ValueError:
+            continue
+        if action and record.get("action") != action:
+            continue
+        if since and record["timestamp"] < since:
+            continue
+        if until and record["timestamp"] > until:
+            continue
+        record_lines = format_log_record(record).rstrip("\n").split("\n")
+        for i, line in enumerate(record_lines):
+            if pattern.search(line):
+                results.append({
+                    "file": str(path),
+                    "line": lineno,
+                    "text": line,
+                    "before": record_lines[max(0, i - context):i],
+                    "after": record_lines[i + 1:i + 1 + context],
+                })
+                if limit and len(results) >= limit:
+                    return results
+    return results
+
+def search_logs(regex, action=None, since=None, until=None, limit=None, context=LOG_SEARCH_CONTEXT, ignore_case=False):
+    """Yield matches across the log store and legacy log files as each file is scanned."""
+    flags = re.IGNORECASE if ignore_case else 0
+    re.compile(regex, flags)  # fail fast on a bad pattern
+
+    jobs = [(path, "segment") for path in LOG_STORE.segments_for(action, since, until)]
+    legacy_file = LOG_DIR / action if action and action.endswith(".log") else None
+    if legacy_file and legacy_file.is_file():
+        jobs = [(legacy_file, "legacy")]
+        action = since = until = None
+    else:
+        for func_name, files in legacy_log_files().items():
+            if action and func_name != action:
+                continue
+            for file in files:
+                stamp = legacy_log_timestamp(file)
+                if since and (stamp is None or stamp < since):
+                    continue
+                if until and (stamp is None or stamp > until):
+                    continue
+                jobs.append((file, "legacy"))
+        for archive, info in load_json_cache(ARCHIVE_MANIFEST, {"archives": {}})["archives"].items():
+            if since and info["last"] < since:
+                continue
+            if until and info["first"] > until:
+                continue
+            if action and not any(action in (e["action"], e["file"]) for e in info["entries"]):
+                continue
+            jobs.append((ARCHIVE_DIR / archive, "archive"))
+        if legacy_file:
+            jobs = [job for job in jobs if job[1] == "archive"]
+    if not jobs:
+        return
+
+    executor = ProcessPoolExecutor if len(jobs) > LOG_SEARCH_PROCESS_THRESHOLD else ThreadPoolExecutor
+    found = 0
+    with timed_stage("log_search"), executor(max_workers=min(os.cpu_count() or 1, len(jobs))) as pool:
+        futures = [
+            pool.submit(scan_log_file, path, regex, flags, kind, action, since, until, context, limit)
+            for path, kind in jobs
+        ]
+        try:
+            for future in as_completed(futures):
+                for match in future.result():
+                    yield match
+                    found += 1
+                    if limit and found >= limit:
+                        return
+        finally:
+            for future in futures:
+                future.cancel()
+
+def iter_archive_entries(archive_path):
+    """Yield the legacy log files stored in a compacted archive, once each."""
+    seen = set()
+    with gzip.open(archive_path, "rt") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            # An interrupted compaction can leave a file archived twice
+            if entry["file"] not in seen:
+                seen.add(entry["file"])
+                yield entry
+
+def archived_log_summary():
+    """Return {action: {archive: {"count", "first", "last"}}} from the archive manifest."""
+    summary = {}
+    for archive, info in load_json_cache(ARCHIVE_MANIFEST, {"archives": {}})["archives"].items():
+        for entry in info["entries"]:
+            total = summary.setdefault(entry["action"], {}).setdefault(
+                archive, {"count": 0, "first": entry["timestamp"], "last": entry["timestamp"]})
+            total["count"] += 1
+            total["first"] = min(total["first"], entry["timestamp"])
+            total["last"] = max(total["last"], entry["timestamp"])
+    return summary
+
+def compact_legacy_logs(granularity="month", min_age_days=1):
+    """Fold legacy per-action *.log files older than min_age_days into gzip archives.
+
+    Each archive holds one day or month as JSON lines (file, action, timestamp,
+    content) and the manifest records which original files it contains.
+    Returns the number of files compacted.
+    """
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+    manifest = load_json_cache(ARCHIVE_MANIFEST, {"archives": {}})
+    archived = {e["file"] for info in manifest["archives"].values() for e in info["entries"]}
+    cutoff = (datetime.datetime.now() - datetime.timedelta(days=min_age_days)).strftime('%Y-%m-%d %H:%M:%S')
+
+    groups = {}
+    for func_name, files in legacy_log_files().items():
+        for file in files:
+            stamp = legacy_log_timestamp(file)
+            if stamp is None or stamp >= cutoff:
+                continue
+            period = stamp[:7] if granularity == "month" else stamp[:10]
+            groups.setdefault(f"legacy-{period}.jsonl.gz", []).append((file, func_name, stamp))
+
+    compacted = 0
+    for archive, files in sorted(groups.items()):
+        info = manifest["archives"].setdefault(archive, {"first": files[0][2], "last": files[0][2], "entries": []})
+        # Appending adds a new gzip member; readers see one continuous stream
+        with gzip.open(ARCHIVE_DIR / archive, "at") as gz:
+            for file, func_name, stamp in files:
+                if file.name in archived:
+                    continue
+                content = file.read_text(errors="replace")
+                gz.write(json.dumps({"file": file.name, "action": func_name, "timestamp": stamp, "content": content}) + "\n")
+                info["entries"].append({"file": file.name, "action": func_name, "timestamp": stamp, "bytes": len(content)})
+                info["first"] = min(info["first"], stamp)
+                info["last"] = max(info["last"], stamp)
+        save_json_cache(ARCHIVE_MANIFEST, manifest)
+        for file, _, _ in files:
+            file.unlink(missing_ok=True)
+            compacted += 1
+    return compacted
+
+def apply_log_retention(max_age_days=None, max_bytes=None):
+    """Delete the oldest archives, closed segments and legacy files by age and total size.
+
+    The segment being written is never removed, nor are *.log files whose
+    name carries no console timestamp. Returns the removed paths.
+    """
+    manifest = load_json_cache(ARCHIVE_MANIFEST, {"archives": {}})
+    candidates = []
+    for archive, info in manifest["archives"].items():
+        path = ARCHIVE_DIR / archive
+        if path.exists():
+            candidates.append((info["last"], path, "archive"))
+    for path, entry in LOG_STORE.segment_summaries():
+        if entry["last"] and path.exists():
+            candidates.append((entry["last"], path, "segment"))
+    for files in legacy_log_files().values():
+        for file in files:
+            stamp = legacy_log_timestamp(file)
+            if stamp is not None:
+                candidates.append((stamp, file, "legacy"))
+    candidates.sort(key=lambda c: c[0])
+
+    doomed = []
+    if max_age_days is not None:
+        cutoff = (datetime.datetime.now() - datetime.timedelta(days=max_age_days)).strftime('%Y-%m-%d %H:%M:%S')
+        doomed = [c for c in candidates if c[0] < cutoff]
+    if max_bytes is not None:
+        doomed_paths = {c[1] for c in doomed}
+        kept = [c for c in candidates if c[1] not in doomed_paths]
+        total = sum(c[1].stat().st_size for c in kept)
+        total += LOG_STORE.index_file.stat().st_size if LOG_STORE.index_file.exists() else 0
+        for candidate in kept:
+            if total <= max_bytes:
+                break
+            total -= candidate[1].stat().st_size
+            doomed.append(candidate)
+
+    LOG_STORE.remove_segments([path for _, path, kind in doomed if kind == "segment"])
+    for _, path, kind in doomed:
+        if kind == "archive":
+            path.unlink(missing_ok=True)
+            del manifest["archives"][path.name]
+        elif kind == "legacy":
+            path.unlink(missing_ok=True)
+    if any(kind == "archive" for _, _, kind in doomed):
+        save_json_cache(ARCHIVE_MANIFEST, manifest)
+    return [path for _, path, _ in doomed]
+
+def compact_logs():
+    granularity = input(Fore.CYAN + "Archive legacy logs per day or month? [month]: ").strip().lower() or "month"
+    if granularity not in ("day", "month"):
+        print(Fore.RED + "Please answer 'day' or 'month'.")
+        return
+    try:
+        min_age = int(input(Fore.CYAN + "Only compact legacy files older than N days [1]: ").strip() or 1)
+        retention_days = input(Fore.CYAN + f"Delete logs older than N days [{LOG_RETENTION_DAYS or 'keep'}]: ").strip()
+        retention_days = retention_days or LOG_RETENTION_DAYS
+        retention_days = int(retention_days) if retention_days else None
+        max_mb = input(Fore.CYAN + f"Keep total log size under N MB [{LOG_RETENTION_MAX_MB or 'no limit'}]: ").strip()
+        max_mb = max_mb or LOG_RETENTION_MAX_MB
+        max_bytes = int(float(max_mb) * 1024 * 1024) if max_mb else None
+    except ValueError:
+        print(Fore.RED + "Please enter numbers.")
+        return
+
+    compacted = compact_legacy_logs(granularity, min_age)
+    removed = apply_log_retention(retention_days, max_bytes)
+    output = f"Compacted {compacted} legacy log files into {granularity}ly archives in {ARCHIVE_DIR}."
+    output += f"\nRemoved {len(removed)} old log files by retention."
+    for path in removed:
+        output += f"\n- {path}"
+    print(Fore.GREEN + output)
+    log_action("compact_logs", "Compacted and pruned logs.", output)
+
+def parse_date_bound(text, end_of_day=False):
+    """Turn 'YYYY-MM-DD' into a log timestamp bound; blank means unbounded."""
+    text = text.strip()
+    if not text:
+        return None
+    datetime.datetime.strptime(text, "%Y-%m-%d")
+    return f"{text} {'23:59:59' if end_of_day else '00:00:00'}"
 
 def search_in_logs():
     view_logs()
-    file = input(Fore.CYAN + "\nEnter log file name: ")
+    source = input(Fore.CYAN + "\nEnter action name or legacy log file name (blank for all logs): ").strip()
+    try:
+        since = parse_date_bound(input(Fore.CYAN + "From date YYYY-MM-DD (blank for any): "))
+        until = parse_date_bound(input(Fore.CYAN + "To date YYYY-MM-DD (blank for any): "), end_of_day=True)
+    except ValueError:
+        print(Fore.RED + "Invalid date. Use YYYY-MM-DD.")
+        return
     regex = input(Fore.CYAN + "Enter regex pattern to search: ")
-    filepath = LOG_DIR / file
-    if not filepath.exists():
-        print(Fore.RED + "Log file not found.")
-        return
-    with open(filepath) as f:
-        matches = [line for line in f if re.search(regex, line)]
-    if matches:
-        print(Fore.GREEN + f"\nMatches found in {file}:\n")
-        for match in matches:
-            print(match.strip())
-    else:
+    limit = input(Fore.CYAN + "Maximum matches to show (blank for no limit): ").strip()
+    limit = int(limit) if limit.isdigit() and int(limit) > 0 else None
+
+    matches = []
+    try:
+        for match in search_logs(regex, source or None, since, until, limit):
+            if not matches:
+                print(Fore.GREEN + "\nMatches found:\n")
+            matches.append(f"{match['file']}:{match['line']}: {match['text']}")
+            print(Fore.YELLOW + f"{match['file']}:{match['line']}")
+            for line in match["before"]:
+                print(f"  {line}")
+            print(Fore.GREEN + f"> {match['text']}")
+            for line in match["after"]:
+                print(f"  {line}")
+    except re.error as e:
+        print(Fore.RED + f"Invalid regex pattern: {e}")
+        return
+    if not matches:
         print(Fore.YELLOW + "No matches found.")
 
-    log_action("search_logs", f"Searched for '{regex}' in {file}", "\n".join(matches))
+    log_action("search_logs", f"Searched for '{regex}' in {source or 'all logs'}", "\n".join(matches))
 
 def read_log_file():
     print("\n========== Available Log Files ==========")
     try:
         view_logs()
         print("=========================================")
-        filename = input("Enter the exact filename of the log you want to read: ").strip()
-        filepath = os.path.join(LOG_DIR, filename)
+        filename = input("Enter the action name, legacy filename or archive name of the log you want to read: ").strip()
+        lines = read_log_lines(filename)
 
-        if not os.path.isfile(filepath):
-            print(f"File '{filename}' does not exist in {LOG_DIR}.")
+        if lines is None:
+            print(f"No log named '{filename}' exists in {LOG_DIR}.")
             return
 
         print(f"\n========== Contents of {filename} ==========")
-        with open(filepath, 'r') as f:
-            print(f.read())
+        print("".join(lines))
         print("============================================")
 
     except Exception as e:
@@ -334,24 +2592,12 @@ def get_python_executable(python_version):
 
 
 def is_library_version_on_pypi(python_exec, library, version):
-    """Check if a library version exists on PyPI using pip index."""
-    try:
-        result = subprocess.run(
-            [python_exec, "-m", "pip", "index", "versions", library],
-            capture_output=True,
-            text=True
-        )
-        if result.returncode != 0 or "Available versions:" not in result.stdout:
-            return False
-
-        versions_line = [line for line in result.stdout.splitlines() if "Available versions:" in line]
-        if versions_line:
-            all_versions = re.findall(r"[\d.]+", versions_line[0])
-            return version in all_versions
-        return False
-    except Exception as e:
-        print(f"❌ PyPI check failed: {e}")
+    """Check if a library version exists on PyPI using the version-index cache."""
+    versions, error = get_available_versions(python_exec, library, wanted=version)
+    if error:
+        print(f"❌ PyPI check failed: {error}")
         return False
+    return version in versions
 
 
 def install_library():
@@ -359,7 +2605,7 @@ def install_library():
 
     # Prompt 1: Python version
     python_version = prompt_user("Enter the Python version (e.g., 3.9)")
-    python_exec = get_python_executable(python_version)
+    python_exec = resolve_python_executable(python_version)
     if not python_exec:
         print(f"❌ Python {python_version} not found. Please install it or choose a valid version.")
         return
@@ -384,31 +2630,26 @@ def install_library():
         return
 
     # Perform the installation
-    try:
-        subprocess.run(
-            [python_exec, "-m", "pip", "install", f"{library}=={version}"],
-            check=True
-        )
+    result = run_command(
+        [python_exec, "-m", "pip", "install", f"{library}=={version}"],
+        "install_library",
+        f"Installing {library}=={version} for Python {python_version}"
+    )
+    if result.returncode == 0:
         print(f"✅ {library}=={version} successfully installed for Python {python_version}.")
-        log_action(logfile, f"Successfully installed {library}=={version} for Python {python_version}")
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Installation failed: {e}")
-        log_action(logfile, f"❌ Installation failed: {library}=={version} for Python {python_version}")
+        log_action("install_library", f"Successfully installed {library}=={version} for Python {python_version}")
+    else:
+        print(f"❌ Installation failed with exit code {result.returncode}")
+        log_action("install_library", f"❌ Installation failed: {library}=={version} for Python {python_version}")
 
 
 def check_library_version_installed(python_exec, library, version):
-    """Check if a specific version of a library is installed."""
-    try:
-        result = subprocess.run(
-            [python_exec, "-m", "pip", "freeze"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        installed_packages = result.stdout.strip().splitlines()
-        return any(line == f"{library}=={version}" for line in installed_packages)
-    except Exception:
-        return False
+    """Check if a specific version of a library is installed: (True/False, None), or (None, error)."""
+    packages, error = probe_packages(python_exec)
+    if packages is None:
+        return None, error
+    package = find_package(packages, library)
+    return bool(package) and package["version"] == version, None
 
 
 def uninstall_library():
@@ -416,7 +2657,7 @@ def uninstall_library():
 
     # Prompt 1: Python version
     python_version = prompt_user("Enter the Python version (e.g., 3.9)")
-    python_exec = get_python_executable(python_version)
+    python_exec = resolve_python_executable(python_version)
     if not python_exec:
         print(f"❌ Python {python_version} not found. Please install it or choose a valid version.")
         return
@@ -430,10 +2671,16 @@ def uninstall_library():
 
     # Validate if this version is currently installed
     print(f"🔍 Checking if {library}=={version} is installed for Python {python_version}...")
-    if not check_library_version_installed(python_exec, library, version):
+    installed, error = check_library_version_installed(python_exec, library, version)
+    if installed is None:
+        print(f"❌ Could not read installed packages for Python {python_version}: {error}")
+        log_action("uninstall_library", f"Package probe failed for Python {python_version}", error)
+        return
+    if not installed:
         print(f"❌ {library}=={version} is not installed for Python {python_version}.")
         return
     print(f"✅ {library}=={version} is currently installed.")
+    warn_reverse_dependents(python_exec, library, "uninstall_library")
 
     # Prompt 4: Confirmation
     if not confirm(f"Do you want to uninstall {library}=={version} for Python {python_version}?"):
@@ -441,19 +2688,1411 @@ def uninstall_library():
         return
 
     # Perform the uninstallation
+    result = run_command(
+        [python_exec, "-m", "pip", "uninstall", "-y", library],
+        "uninstall_library",
+        f"Uninstalling {library}=={version} for Python {python_version}"
+    )
+    if result.returncode == 0:
+        print(f"✅ {library}=={version} successfully uninstalled from Python {python_version}.")
+        log_action("uninstall_library", f"Successfully uninstalled {library}=={version} for Python {python_version}")
+    else:
+        print(f"❌ Uninstallation failed with exit code {result.returncode}")
+        log_action("uninstall_library", f"❌ Uninstallation failed for library: {library}=={version}, for Python {python_version}")
+
+def resolve_python_executable(target):
+    """Accept a version such as 3.11 or a path to an interpreter."""
+    if "/" in str(target):
+        return str(target) if os.access(target, os.X_OK) else None
+    return get_python_executable(target)
+
+def interpreter_key(python_exec):
+    """Identify the environment behind an executable; venvs share the base binary, so key them by prefix."""
+    bin_dir = Path(os.path.realpath(Path(python_exec).parent))
+    if (bin_dir.parent / "pyvenv.cfg").exists():
+        return str(bin_dir.parent)
+    return os.path.realpath(python_exec)
+
+def load_package_manifest(manifest_path):
+    """Read a JSON manifest into {interpreter path: {"install": [...], "uninstall": [...]}}.
+
+    Accepted layout:
+        {"interpreters": [{"python": "3.11", "install": ["requests", "numpy==1.26.4"],
+                           "uninstall": ["six"]}]}
+    Entries naming the same interpreter are merged.
+    """
+    with open(manifest_path) as f:
+        data = json.load(f)
+    entries = data["interpreters"] if isinstance(data, dict) else data
+    plan = {}
+    errors = []
+    for entry in entries:
+        python_exec = resolve_python_executable(entry["python"])
+        if not python_exec:
+            errors.append(f"Python {entry['python']} not found.")
+            continue
+        ops = plan.setdefault(interpreter_key(python_exec), {"python": python_exec, "install": [], "uninstall": []})
+        ops["install"].extend(entry.get("install", []))
+        ops["uninstall"].extend(entry.get("uninstall", []))
+    return plan, errors
+
+def package_versions(python_exec):
+    """Return {normalized name: version} for an interpreter, or None if it could not be read."""
+    packages = get_installed_packages(python_exec)
+    return None if packages is None else {name: p["version"] for name, p in packages.items()}
+
+def rollback_packages(python_exec, before, prefix=""):
+    """Put an interpreter's package set back to a previous {name: version} state.
+
+    Refuses (returns False) unless both the previous and the current state
+    are known, since an empty state would uninstall the whole environment.
+    """
+    after = package_versions(python_exec)
+    if before is None or after is None:
+        log_action("apply_package_manifest", f"Rollback skipped for {python_exec}: package state unknown")
+        return False
+    added = [name for name in after if name not in before]
+    restore = [f"{name}=={version}" for name, version in before.items() if after.get(name) != version]
+    if added:
+        run_command([python_exec, "-m", "pip", "uninstall", "-y", *added],
+                    "apply_package_manifest", f"Rollback: removed {' '.join(added)} from {python_exec}", prefix=prefix)
+    if restore:
+        run_command([python_exec, "-m", "pip", "install", "--no-deps", *restore],
+                    "apply_package_manifest", f"Rollback: restored {' '.join(restore)} in {python_exec}", prefix=prefix)
+    return True
+
+def apply_package_operations(python_exec, install, uninstall):
+    """Apply one interpreter's batch: one pip uninstall, then one pip install resolving every spec together.
+
+    On failure the interpreter's package set is rolled back to what it was before.
+    """
+    start = time.time()
+    before = package_versions(python_exec)
+    report = {"python": python_exec, "install": install, "uninstall": uninstall, "status": "ok"}
+    if before is None:
+        # Without a known starting state a failure could not be rolled back
+        report["status"] = "skipped (package probe failed)"
+        report["duration"] = round(time.time() - start, 2)
+        return report
+    prefix = f"[{python_exec}] "
+    steps = []
+    if uninstall:
+        steps.append([python_exec, "-m", "pip", "uninstall", "-y", *uninstall])
+    if install:
+        steps.append([python_exec, "-m", "pip", "install", *install])
+    for command in steps:
+        result = run_command(command, "apply_package_manifest", f"Ran {' '.join(command)}", prefix=prefix)
+        if result.returncode != 0:
+            rolled_back = rollback_packages(python_exec, before, prefix)
+            report["status"] = "rolled back" if rolled_back else "failed (rollback skipped: package state unknown)"
+            break
+    report["duration"] = round(time.time() - start, 2)
+    return report
+
+def apply_package_manifest():
+    manifest_path = input(Fore.CYAN + "Enter path to the package manifest (JSON): ").strip()
+    try:
+        plan, errors = load_package_manifest(manifest_path)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(Fore.RED + f"Could not read manifest: {e}")
+        return
+    for error in errors:
+        print(Fore.RED + error)
+    if not plan:
+        print(Fore.RED + "Nothing to do.")
+        return
+
+    print(Fore.YELLOW + "\nPlanned changes:")
+    for key, ops in plan.items():
+        print(Fore.GREEN + f"{ops['python']} ({key})")
+        print(f"  install:   {' '.join(ops['install']) or '-'}")
+        print(f"  uninstall: {' '.join(ops['uninstall']) or '-'}")
+    if not confirm("Apply these changes?"):
+        print("🚫 Batch cancelled.")
+        return
+
+    # Different interpreters run concurrently; each one gets a single resolver pass
+    output = ""
+    with ThreadPoolExecutor(max_workers=min(PROBE_WORKERS, len(plan))) as pool:
+        futures = {
+            pool.submit(apply_package_operations, ops["python"], ops["install"], ops["uninstall"]): key
+            for key, ops in plan.items()
+        }
+        for future in as_completed(futures):
+            report = future.result()
+            color = Fore.GREEN if report["status"] == "ok" else Fore.RED
+            summary = (f"{report['python']} ({futures[future]}): {report['status']} in {report['duration']}s, "
+                       f"installed [{' '.join(report['install'])}], removed [{' '.join(report['uninstall'])}]")
+            print(color + summary)
+            output += f"{summary}\n"
+    log_action("apply_package_manifest", f"Applied package manifest {manifest_path}", output.strip())
+
+def interpreter_abi_tag(python_exec):
+    """Return a tag such as cpython-311-linux_x86_64 naming the wheels an interpreter can share, or None."""
+    try:
+        result = run_subprocess([python_exec, "-c", ABI_PROBE], capture_output=True, text=True,
+                                timeout=PACKAGE_PROBE_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    tag = result.stdout.strip()
+    return tag if result.returncode == 0 and tag else None
+
+def build_wheelhouse(python_exec, specs, wheel_dir):
+    """Resolve specs and their dependencies into wheel_dir with a single `pip wheel` run."""
+    wheel_dir.mkdir(parents=True, exist_ok=True)
+    command = [python_exec, "-m", "pip", "wheel", "--wheel-dir", str(wheel_dir), "--find-links", str(wheel_dir)]
+    if LOCAL_PACKAGE_INDEX:
+        command += ["--no-index", "--find-links", LOCAL_PACKAGE_INDEX]
+    return run_command(command + specs, "install_everywhere",
+                       f"Built wheels for {' '.join(specs)} into {wheel_dir}", prefix=f"[{wheel_dir.name}] ")
+
+def install_from_wheelhouse(python_exec, specs, wheel_dir):
+    """Install specs into one interpreter from wheel_dir only; roll back on failure."""
+    start = time.time()
+    before = package_versions(python_exec)
+    if before is None:
+        return {"python": python_exec, "status": "skipped (package probe failed)", "duration": 0}
+    result = run_command(
+        [python_exec, "-m", "pip", "install", "--no-index", "--find-links", str(wheel_dir), *specs],
+        "install_everywhere", f"Installed {' '.join(specs)} into {python_exec} from {wheel_dir}",
+        prefix=f"[{python_exec}] "
+    )
+    status = "ok"
+    if result.returncode != 0:
+        rolled_back = rollback_packages(python_exec, before, f"[{python_exec}] ")
+        status = "rolled back" if rolled_back else "failed (rollback skipped: package state unknown)"
+    return {"python": python_exec, "status": status, "duration": round(time.time() - start, 2)}
+
+def install_everywhere_plan(targets):
+    """Resolve targets to interpreters and group them by ABI tag: ({tag: [python_exec]}, errors)."""
+    interpreters = {}
+    errors = []
+    for target in targets:
+        python_exec = resolve_python_executable(target)
+        if python_exec:
+            interpreters.setdefault(interpreter_key(python_exec), python_exec)
+        else:
+            errors.append(f"Python {target} not found.")
+    groups = {}
+    with ThreadPoolExecutor(max_workers=min(PROBE_WORKERS, len(interpreters) or 1)) as pool:
+        for python_exec, tag in zip(interpreters.values(), pool.map(interpreter_abi_tag, interpreters.values())):
+            if tag:
+                groups.setdefault(tag, []).append(python_exec)
+            else:
+                errors.append(f"Could not read the ABI tag of {python_exec}.")
+    return groups, errors
+
+def install_everywhere_run(specs, groups):
+    """Build wheels once per ABI group, then install into every interpreter of the group in parallel."""
+    reports = []
+    with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as pool:
+        builds = {
+            pool.submit(build_wheelhouse, pythons[0], specs, WHEELHOUSE_DIR / tag): tag
+            for tag, pythons in groups.items()
+        }
+        installs = []
+        for future in as_completed(builds):
+            tag = builds[future]
+            if future.result().returncode != 0:
+                reports += [{"python": p, "status": "build failed", "duration": 0} for p in groups[tag]]
+                continue
+            installs += [pool.submit(install_from_wheelhouse, p, specs, WHEELHOUSE_DIR / tag) for p in groups[tag]]
+        reports += [future.result() for future in installs]
+    return reports
+
+def install_everywhere():
+    specs = input(Fore.CYAN + "Enter package spec(s) to install (e.g., requests==2.32.3): ").split()
+    if not specs:
+        print(Fore.RED + "No packages given.")
+        return
+    interpreters = discover_interpreters()
+    print(Fore.YELLOW + "\nKnown interpreters: " + ", ".join(name for name, _ in interpreters))
+    answer = input(Fore.CYAN + "Target versions or interpreter paths (space separated, or 'all'): ").strip()
+    targets = [path for _, path in interpreters] if answer == "all" else answer.split()
+    groups, errors = install_everywhere_plan(targets)
+    for error in errors:
+        print(Fore.RED + error)
+    if not groups:
+        print(Fore.RED + "Nothing to do.")
+        return
+
+    print(Fore.YELLOW + "\nOne wheel build per ABI, then an offline install into each interpreter:")
+    for tag, pythons in groups.items():
+        print(Fore.GREEN + f"{tag}: {', '.join(pythons)}")
+    if not confirm(f"Install {' '.join(specs)} into {sum(len(p) for p in groups.values())} interpreter(s)?"):
+        print("🚫 Install cancelled.")
+        return
+
+    output = ""
+    for report in install_everywhere_run(specs, groups):
+        color = Fore.GREEN if report["status"] == "ok" else Fore.RED
+        summary = f"{report['python']}: {report['status']} in {report['duration']}s"
+        print(color + summary)
+        output += f"{summary}\n"
+    log_action("install_everywhere", f"Installed {' '.join(specs)} into {len(groups)} ABI group(s)", output.strip())
+
+def format_size(nbytes):
+    for unit in ("B", "KB", "MB", "GB"):
+        if nbytes < 1024 or unit == "GB":
+            return f"{nbytes:.0f} {unit}" if unit == "B" else f"{nbytes:.1f} {unit}"
+        nbytes /= 1024
+
+def site_package_dirs(python_exec):
+    """Return the site-packages directories on an interpreter's sys.path."""
+    graph = get_dependency_graph(python_exec)
+    if graph is None:
+        return []
+    return [os.path.realpath(d) for d in graph.environment["path"]
+            if os.path.basename(d.rstrip("/")) in ("site-packages", "dist-packages") and os.path.isdir(d)]
+
+def scan_tree_dir(directory):
+    """List one directory: ([(path, size, dev, ino, mtime_ns, mode, uid, gid)], [subdirectories])."""
+    files, subdirs = [], []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        st = entry.stat(follow_symlinks=False)
+                        files.append((entry.path, st.st_size, st.st_dev, st.st_ino, st.st_mtime_ns,
+                                      st.st_mode, st.st_uid, st.st_gid))
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return files, subdirs
+
+def scan_trees(roots):
+    """Walk several directory trees level by level on a thread pool; return {root: [file tuples]}."""
+    results = {root: [] for root in roots}
+    frontier = [(root, root) for root in roots]
+    with ThreadPoolExecutor(max_workers=DISK_SCAN_WORKERS) as pool:
+        while frontier:
+            listings = pool.map(scan_tree_dir, [directory for _, directory in frontier])
+            next_frontier = []
+            for (root, _), (files, subdirs) in zip(frontier, listings):
+                results[root].extend(files)
+                next_frontier.extend((root, d) for d in subdirs)
+            frontier = next_frontier
+    return results
+
+def distribution_sizes(site_dir, sizes):
+    """Return {distribution: bytes} from the RECORD files of a site dir; the rest goes to '(unowned)'."""
+    owned = {}
+    claimed = set()
+    try:
+        entries = [e for e in os.scandir(site_dir) if e.name.endswith(".dist-info")]
+    except OSError:
+        entries = []
+    for entry in entries:
+        name = entry.name[:-len(".dist-info")].rsplit("-", 1)[0]
+        total = 0
+        try:
+            with open(os.path.join(entry.path, "RECORD"), encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    path = os.path.normpath(os.path.join(site_dir, line.split(",", 1)[0].strip('"')))
+                    if path in sizes and path not in claimed:
+                        claimed.add(path)
+                        total += sizes[path]
+        except OSError:
+            continue
+        owned[name] = owned.get(name, 0) + total
+    unowned = sum(size for path, size in sizes.items() if path not in claimed)
+    if unowned:
+        owned["(unowned)"] = unowned
+    return owned
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def find_duplicate_files(files, min_bytes=DEDUP_MIN_BYTES):
+    """Group byte-identical files: by size first, then sha256 for the candidates only.
+
+    Hard links of one inode count once. Hashes are cached by device, inode,
+    size and mtime, so a rescan hashes only new or changed files.
+    Returns [(sha256, size, [file tuples, one per inode])] sorted by reclaimable bytes.
+    """
+    by_size = collections.defaultdict(dict)
+    for file in files:
+        path, size, dev, ino = file[:4]
+        if size >= min_bytes:
+            by_size[size].setdefault((dev, ino), file)
+    candidates = [f for inodes in by_size.values() if len(inodes) > 1 for f in inodes.values()]
+
+    cache = load_json_cache(FILE_HASH_CACHE, {})
+    hashes = {}
+    to_hash = []
+    for file in candidates:
+        path, size, dev, ino, mtime = file[:5]
+        cached = cache.get(f"{dev}:{ino}")
+        if cached and cached["size"] == size and cached["mtime"] == mtime:
+            hashes[path] = cached["sha256"]
+        else:
+            to_hash.append(file)
+
+    def hash_entry(file):
+        try:
+            return hash_file(file[0])
+        except OSError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as pool:
+        for file, digest in zip(to_hash, pool.map(hash_entry, to_hash)):
+            if digest:
+                hashes[file[0]] = digest
+                cache[f"{file[2]}:{file[3]}"] = {"size": file[1], "mtime": file[4], "sha256": digest}
+    if to_hash:
+        save_json_cache(FILE_HASH_CACHE, cache)
+
+    groups = collections.defaultdict(list)
+    for file in candidates:
+        if file[0] in hashes:
+            groups[(hashes[file[0]], file[1])].append(file)
+    duplicates = [(digest, size, members) for (digest, size), members in groups.items() if len(members) > 1]
+    return sorted(duplicates, key=lambda d: -d[1] * (len(d[2]) - 1))
+
+def disk_usage_targets():
+    """Return {label: [site-packages dirs]} for known interpreters and discovered environments."""
+    pythons = [path for _, path in discover_interpreters()]
+    pythons += [env["python"] for env in discover_environments() if os.access(env["python"], os.X_OK)]
+    targets = {}
+    seen = set()
+    with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as pool:
+        for python, dirs in zip(pythons, pool.map(site_package_dirs, pythons)):
+            dirs = [d for d in dirs if d not in seen]
+            if dirs:
+                seen.update(dirs)
+                targets[python] = dirs
+    return targets
+
+@timed_stage("disk_usage_scan")
+def analyze_disk_usage():
+    """Scan every site-packages tree once; return (targets, {site dir: [file tuples]}, duplicates)."""
+    targets = disk_usage_targets()
+    trees = scan_trees([d for dirs in targets.values() for d in dirs])
+    duplicates = find_duplicate_files([f for files in trees.values() for f in files])
+    return targets, trees, duplicates
+
+def show_disk_usage():
+    targets, trees, duplicates = analyze_disk_usage()
+    if not targets:
+        print(Fore.RED + "No site-packages directories found.")
+        return None
+    lines = []
+    for python, dirs in sorted(targets.items()):
+        total = sum(f[1] for d in dirs for f in trees[d])
+        count = sum(len(trees[d]) for d in dirs)
+        lines.append(f"\n{python}: {format_size(total)} in {count} files")
+        for site_dir in dirs:
+            sizes = {f[0]: f[1] for f in trees[site_dir]}
+            ranked = sorted(distribution_sizes(site_dir, sizes).items(), key=lambda item: -item[1])
+            lines.append(f"  {site_dir}")
+            lines += [f"    {name:<32} {format_size(size):>10}" for name, size in ranked[:10]]
+            if len(ranked) > 10:
+                lines.append(f"    ... {len(ranked) - 10} more distributions")
+
+    reclaimable = sum(size * (len(members) - 1) for _, size, members in duplicates)
+    lines.append(f"\nDuplicate files across site-packages (>= {format_size(DEDUP_MIN_BYTES)}): "
+                 f"{len(duplicates)} sets, {sum(len(m) for _, _, m in duplicates)} copies, "
+                 f"{format_size(reclaimable)} reclaimable")
+    for digest, size, members in duplicates[:10]:
+        lines.append(f"  {digest[:12]} {format_size(size)} x{len(members)}: {members[0][0]}")
+    output = "\n".join(lines)
+    print(Fore.GREEN + output)
+    log_action("disk_usage", "Analyzed site-packages disk usage", output.strip())
+    return duplicates
+
+def dedup_with_hardlinks(duplicates):
+    """Replace duplicate copies with hard links to one copy per filesystem; return the undo manifest path.
+
+    Only files with the same mode and owner as the kept copy are linked.
+    The kept copy and each file are re-checked against their scanned inode,
+    size and mtime first; a group whose kept copy changed is skipped whole.
+    """
+    DEDUP_DIR.mkdir(parents=True, exist_ok=True)
+    manifest_path = DEDUP_DIR / f"dedup_{datetime.datetime.now().strftime('%Y%m%d_%H_%M_%S')}.json"
+    linked = []
+    for digest, size, members in duplicates:
+        by_device = collections.defaultdict(list)
+        for file in members:
+            by_device[file[2]].append(file)
+        for files in by_device.values():
+            keeper = files[0]
+            try:
+                keeper_st = os.stat(keeper[0], follow_symlinks=False)
+            except OSError:
+                continue
+            if (keeper_st.st_ino, keeper_st.st_size, keeper_st.st_mtime_ns) != (keeper[3], keeper[1], keeper[4]):
+                continue  # replaced since the scan, e.g. by a pip upgrade
+            keeper_owner = (keeper_st.st_mode, keeper_st.st_uid, keeper_st.st_gid)
+            for path, _, dev, ino, mtime, *_ in files[1:]:
+                try:
+                    st = os.stat(path, follow_symlinks=False)
+                    if (st.st_ino, st.st_size, st.st_mtime_ns) != (ino, size, mtime):
+                        continue
+                    if (st.st_mode, st.st_uid, st.st_gid) != keeper_owner:
+                        continue
+                    temp = f"{path}.dedup-tmp"
+                    os.link(keeper[0], temp)
+                    os.replace(temp, path)
+                except OSError:
+                    continue
+                linked.append({"path": path, "keeper": keeper[0], "sha256": digest, "size": size,
+                               "mode": st.st_mode, "uid": st.st_uid, "gid": st.st_gid,
+                               "atime_ns": st.st_atime_ns, "mtime_ns": st.st_mtime_ns})
+    save_json_cache(manifest_path, {"created": datetime.datetime.now().isoformat(timespec="seconds"),
+                                    "files": linked})
+    return manifest_path, linked
+
+def undo_dedup(manifest_path):
+    """Give every file linked by a dedup run its own copy again; return (restored, skipped)."""
+    manifest = load_json_cache(Path(manifest_path), {})
+    restored = skipped = 0
+    for entry in manifest.get("files", []):
+        path, keeper = entry["path"], entry["keeper"]
+        try:
+            if not os.path.samefile(path, keeper):
+                skipped += 1  # replaced since, e.g. by a pip upgrade
+                continue
+            temp = f"{path}.undo-tmp"
+            shutil.copyfile(keeper, temp)
+            os.chmod(temp, entry["mode"] & 0o7777)
+            if os.geteuid() == 0:
+                os.chown(temp, entry["uid"], entry["gid"])
+            os.utime(temp, ns=(entry["atime_ns"], entry["mtime_ns"]))
+            os.replace(temp, path)
+            restored += 1
+        except OSError:
+            skipped += 1
+    return restored, skipped
+
+def disk_usage_menu():
+    duplicates = None
+    while True:
+        print(Fore.YELLOW + """
+Site-packages Disk Usage
+-------------------------------------------
+1. Analyze disk usage and duplicate files
+2. Replace duplicates with hard links
+3. Undo a hard-link dedup
+4. Back to main menu
+""")
+        choice = input(Fore.GREEN + "Enter your choice: ")
+        if choice == "1":
+            duplicates = show_disk_usage()
+        elif choice == "2":
+            if duplicates is None:
+                duplicates = show_disk_usage() or []
+            if not duplicates:
+                print(Fore.YELLOW + "No duplicates to link.")
+                continue
+            if not confirm(f"Replace duplicates in {len(duplicates)} sets with hard links?"):
+                print("🚫 Dedup cancelled.")
+                continue
+            manifest_path, linked = dedup_with_hardlinks(duplicates)
+            output = (f"Linked {len(linked)} files, reclaimed {format_size(sum(e['size'] for e in linked))}. "
+                      f"Undo manifest: {manifest_path}")
+            print(Fore.GREEN + output)
+            log_action("disk_usage", "Replaced duplicate files with hard links", output)
+            duplicates = None
+        elif choice == "3":
+            manifests = sorted(DEDUP_DIR.glob("dedup_*.json")) if DEDUP_DIR.exists() else []
+            if not manifests:
+                print(Fore.YELLOW + "No dedup manifests found.")
+                continue
+            for number, path in enumerate(manifests, start=1):
+                print(Fore.GREEN + f"{number}. {path.name}")
+            pick = input(Fore.CYAN + "Enter manifest number: ").strip()
+            if not (pick.isdigit() and 1 <= int(pick) <= len(manifests)):
+                print(Fore.RED + "Invalid manifest number.")
+                continue
+            restored, skipped = undo_dedup(manifests[int(pick) - 1])
+            output = f"Restored {restored} files from {manifests[int(pick) - 1].name}, skipped {skipped}."
+            print(Fore.GREEN + output)
+            log_action("disk_usage", "Undid a hard-link dedup", output)
+            duplicates = None
+        elif choice == "4":
+            break
+        else:
+            print(Fore.RED + "Invalid choice. Please try again.")
+
+BACKGROUND_MAX_JOBS = 4
+JOB_FINISHED = ("done", "failed", "cancelled")
+# Seconds a cancelled job's process group gets after SIGTERM before SIGKILL
+JOB_CANCEL_GRACE = 5
+
+
+class BackgroundJob:
+    def __init__(self, job_id, description, command, lock_key, log_name):
+        self.id = job_id
+        self.description = description
+        self.command = command
+        self.lock_key = lock_key
+        self.log_name = log_name
+        self.status = "queued"
+        self.tee = None
+        self.result = None
+        self.error = ""
+        self.future = None
+        self.task = None
+
+    def elapsed(self):
+        if self.result:
+            return self.result.duration
+        return round(time.time() - self.tee.start, 1) if self.tee else 0
+
+    def output_tail(self):
+        if self.result:
+            return self.result.output
+        return "\n".join(self.tee.tail) if self.tee else ""
+
+
+class JobScheduler:
+    """Runs commands as background jobs on an asyncio loop in a daemon thread.
+
+    Jobs sharing a lock key (one interpreter's site-packages, or the system
+    package manager) run one at a time; different keys run in parallel, up to
+    max_jobs at once.
+    """
+
+    def __init__(self, max_jobs=BACKGROUND_MAX_JOBS):
+        self.max_jobs = max_jobs
+        self.jobs = {}
+        self.next_id = 1
+        self.lock = threading.Lock()
+        self.loop = None
+        self.limit = None
+        self.key_locks = {}
+
+    def _ensure_loop(self):
+        if self.loop:
+            return
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.limit = asyncio.Semaphore(self.max_jobs)
+            ready.set()
+            self.loop.run_forever()
+
+        threading.Thread(target=run, name="job-scheduler", daemon=True).start()
+        ready.wait()
+
+    def submit(self, description, command, lock_key, log_name):
+        with self.lock:
+            self._ensure_loop()
+            job = BackgroundJob(self.next_id, description, command, lock_key, log_name)
+            self.next_id += 1
+            self.jobs[job.id] = job
+        job.future = asyncio.run_coroutine_threadsafe(self._run(job), self.loop)
+        job.future.add_done_callback(lambda f: self._mark_cancelled(job) if f.cancelled() else None)
+        return job
+
+    @staticmethod
+    def _mark_cancelled(job):
+        if job.status not in JOB_FINISHED:
+            job.status = "cancelled"
+
+    @staticmethod
+    async def _stop_process_group(process):
+        """SIGTERM the job's whole process group, SIGKILL it after a grace period, and wait for it."""
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            try:
+                os.killpg(process.pid, sig)
+            except ProcessLookupError:
+                break
+            try:
+                await asyncio.wait_for(asyncio.shield(process.wait()), JOB_CANCEL_GRACE)
+                break
+            except asyncio.TimeoutError:
+                continue
+        await process.wait()
+
+    async def _run(self, job):
+        job.task = asyncio.current_task()
+        key_lock = self.key_locks.setdefault(job.lock_key, asyncio.Lock())
+        try:
+            async with key_lock, self.limit:
+                job.status = "running"
+                job.tee = OutputTee(job.log_name, job.description, echo=False, command=job.command)
+                # Own session: cancelling reaches children such as sudo's, and nothing reads the menu's terminal
+                options = dict(stdin=asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.PIPE,
+                               stderr=asyncio.subprocess.STDOUT, limit=2 ** 20, start_new_session=True)
+                if isinstance(job.command, str):
+                    process = await asyncio.create_subprocess_shell(job.command, **options)
+                else:
+                    process = await asyncio.create_subprocess_exec(*job.command, **options)
+                try:
+                    async for raw in process.stdout:
+                        job.tee.feed(raw.decode(errors="replace").rstrip("\n"))
+                    await process.wait()
+                except asyncio.CancelledError:
+                    await self._stop_process_group(process)
+                    job.result = job.tee.finish(process.returncode)
+                    raise
+                job.result = job.tee.finish(process.returncode)
+                job.status = "done" if process.returncode == 0 else "failed"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except OSError as e:
+            job.error = str(e)
+            job.result = job.tee.finish(127)
+            job.status = "failed"
+
+    def cancel(self, job_id):
+        """Request cancellation; the status becomes "cancelled" once the job's processes have exited."""
+        job = self.jobs.get(job_id)
+        if not job or job.status in JOB_FINISHED:
+            return False
+        if job.status == "cancelling":
+            return True  # a second cancel would interrupt the process group's shutdown
+        if job.task is None:
+            job.future.cancel()  # not picked up by the loop yet
+        else:
+            job.status = "cancelling"
+            self.loop.call_soon_threadsafe(job.task.cancel)
+        return True
+
+    def active(self):
+        return [job for job in self.jobs.values() if job.status not in JOB_FINISHED]
+
+    def shutdown(self):
+        """Cancel every active job and wait until their process groups have exited and been logged.
+
+        Leaving them to die with the loop thread would close their stdout
+        pipe, and pip or apt would get SIGPIPE mid-transaction.
+        """
+        active = self.active()
+        for job in active:
+            self.cancel(job.id)
+        wait([job.future for job in active])
+        return active
+
+
+JOB_SCHEDULER = JobScheduler()
+atexit.register(JOB_SCHEDULER.shutdown)
+
+def queue_pip_install_job():
+    answer = input(Fore.CYAN + "Enter Python versions or interpreter paths (e.g., 3.10 3.11): ")
+    targets = [t for t in re.split(r"[,\s]+", answer) if t]
+    packages = [p for p in re.split(r"[,\s]+", input(Fore.CYAN + "Enter packages to install: ")) if p]
+    if not targets or not packages:
+        print(Fore.RED + "Both interpreters and packages are required.")
+        return
+    for target in targets:
+        python_exec = resolve_python_executable(target)
+        if not python_exec:
+            print(Fore.RED + f"Python {target} not found.")
+            continue
+        job = JOB_SCHEDULER.submit(
+            f"pip install {' '.join(packages)} for {python_exec}",
+            [python_exec, "-m", "pip", "install", *packages],
+            interpreter_key(python_exec),
+            "install_module"
+        )
+        print(Fore.GREEN + f"Queued job {job.id}: {job.description}")
+
+def queue_python_install_job():
+    package_manager = get_package_manager()
+    if not package_manager:
+        print(Fore.RED + "Unsupported Linux distribution.")
+        return
+    answer = input(Fore.CYAN + "Enter Python version(s) to install (e.g., 3.10 3.11): ")
+    versions = [v for v in re.split(r"[,\s]+", answer) if v]
+    if not versions:
+        print(Fore.RED + "No Python version given.")
+        return
+    command = package_manager.install_shell_command(versions)
+    if "sudo" in command:
+        # Ask for the password now, while the menu owns the terminal
+        try:
+            authorized = run_subprocess(["sudo", "-v"]).returncode == 0
+        except OSError:
+            authorized = False
+        if not authorized:
+            print(Fore.RED + "sudo authorization failed; job not queued.")
+            return
+    job = JOB_SCHEDULER.submit(
+        f"Install Python {', '.join(versions)} with {package_manager.name}",
+        command,
+        "system-package-manager",
+        "install_python_version"
+    )
+    print(Fore.GREEN + f"Queued job {job.id}: {job.description}")
+
+def show_jobs():
+    if not JOB_SCHEDULER.jobs:
+        print(Fore.YELLOW + "No background jobs.")
+        return
+    print(Fore.CYAN + "\nBackground Jobs:\n")
+    for job in JOB_SCHEDULER.jobs.values():
+        color = {"done": Fore.GREEN, "failed": Fore.RED, "cancelled": Fore.RED}.get(job.status, Fore.YELLOW)
+        last_line = job.output_tail().rsplit("\n", 1)[-1]
+        print(color + f"[{job.id}] {job.status:<9} {job.elapsed():>7}s  {job.description}")
+        if last_line:
+            print(f"      {last_line[:100]}")
+
+def show_job_output():
+    job_id = input(Fore.CYAN + "Enter job id: ").strip()
+    job = JOB_SCHEDULER.jobs.get(int(job_id)) if job_id.isdigit() else None
+    if not job:
+        print(Fore.RED + "No such job.")
+        return
+    print(Fore.CYAN + f"\n[{job.id}] {job.description} - {job.status} ({job.elapsed()}s)\n")
+    print(job.output_tail() or "(no output yet)")
+    if job.result:
+        print(Fore.GREEN + f"\nExit code: {job.result.returncode}")
+    if job.error:
+        print(Fore.RED + job.error)
+
+def cancel_job():
+    job_id = input(Fore.CYAN + "Enter job id to cancel: ").strip()
+    if job_id.isdigit() and JOB_SCHEDULER.cancel(int(job_id)):
+        print(Fore.YELLOW + f"Cancelling job {job_id}; it shows as cancelled once its processes have exited.")
+        log_action("background_jobs", f"Cancelled job {job_id}")
+    else:
+        print(Fore.RED + "No running or queued job with that id.")
+
+def background_jobs_menu():
+    while True:
+        print(Fore.YELLOW + f"""
+Background Jobs ({len(JOB_SCHEDULER.active())} active)
+-------------------------------------------
+1. Queue pip install for one or more Pythons
+2. Queue Python version install
+3. List jobs
+4. Show job output
+5. Cancel a job
+6. Back to main menu
+""")
+        choice = input(Fore.GREEN + "Enter your choice: ")
+        if choice == "1":
+            queue_pip_install_job()
+        elif choice == "2":
+            queue_python_install_job()
+        elif choice == "3":
+            show_jobs()
+        elif choice == "4":
+            show_job_output()
+        elif choice == "5":
+            cancel_job()
+        elif choice == "6":
+            break
+        else:
+            print(Fore.RED + "Invalid choice. Please try again.")
+
+def prometheus_textfile():
+    """Render the performance stats in the node_exporter textfile format."""
+    metrics = [
+        ("command_total", "Commands spawned, by kind.", "counter", "commands", "count"),
+        ("command_seconds_total", "Wall time spent in spawned commands.", "counter", "commands", "seconds"),
+        ("command_max_seconds", "Slowest single command, by kind.", "gauge", "commands", "max_seconds"),
+        ("command_failures_total", "Commands that exited non-zero.", "counter", "commands", "failures"),
+        ("command_output_bytes_total", "Output bytes read from commands.", "counter", "commands", "output_bytes"),
+        ("stage_total", "Internal stage runs.", "counter", "stages", "count"),
+        ("stage_seconds_total", "Wall time spent in internal stages.", "counter", "stages", "seconds"),
+    ]
+    lines = []
+    with PERF_STATS_LOCK:
+        for name, help_text, metric_type, section, field in metrics:
+            label = "kind" if section == "commands" else "stage"
+            lines.append(f"# HELP python_console_{name} {help_text}")
+            lines.append(f"# TYPE python_console_{name} {metric_type}")
+            for key, stats in sorted(PERF_STATS[section].items()):
+                value = stats[field]
+                lines.append(f'python_console_{name}{{{label}="{key}"}} {round(value, 6) if isinstance(value, float) else value}')
+    return "\n".join(lines) + "\n"
+
+def write_prometheus_textfile(path=None):
+    """Atomically write the stats for the node_exporter textfile collector."""
+    path = Path(path or PROMETHEUS_TEXTFILE)
+    tmp_file = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_file.write_text(prometheus_textfile())
+    os.replace(tmp_file, path)
+    return path
+
+if PROMETHEUS_TEXTFILE:
+    atexit.register(write_prometheus_textfile)
+
+def show_performance_stats():
+    with PERF_STATS_LOCK:
+        commands = sorted(PERF_STATS["commands"].items(), key=lambda item: -item[1]["seconds"])
+        stages = sorted(PERF_STATS["stages"].items(), key=lambda item: -item[1]["seconds"])
+    output = ""
+    print(Fore.CYAN + "\nSpawned Commands (this session):\n")
+    if not commands:
+        print(Fore.YELLOW + "No commands spawned yet.")
+    else:
+        header = f"{'kind':<16} {'count':>6} {'total s':>9} {'avg s':>8} {'max s':>8} {'failed':>6} {'output':>10}"
+        print(Fore.GREEN + header)
+        output += header + "\n"
+        for kind, stats in commands:
+            line = (f"{kind:<16} {stats['count']:>6} {stats['seconds']:>9.3f} {stats['seconds'] / stats['count']:>8.3f} "
+                    f"{stats['max_seconds']:>8.3f} {stats['failures']:>6} {stats['output_bytes']:>10}")
+            print(line)
+            output += line + "\n"
+    print(Fore.CYAN + "\nInternal Stages (this session):\n")
+    if not stages:
+        print(Fore.YELLOW + "No stages timed yet.")
+    else:
+        header = f"{'stage':<22} {'count':>6} {'total s':>9} {'avg s':>8} {'max s':>8}"
+        print(Fore.GREEN + header)
+        output += header + "\n"
+        for stage, stats in stages:
+            line = (f"{stage:<22} {stats['count']:>6} {stats['seconds']:>9.3f} "
+                    f"{stats['seconds'] / stats['count']:>8.3f} {stats['max_seconds']:>8.3f}")
+            print(line)
+            output += line + "\n"
+
+    target = PROMETHEUS_TEXTFILE or input(Fore.CYAN + "\nWrite a Prometheus textfile to (blank to skip): ").strip()
+    if target:
+        try:
+            print(Fore.GREEN + f"Wrote {write_prometheus_textfile(target)}")
+        except OSError as e:
+            print(Fore.RED + f"Could not write textfile: {e}")
+    log_action("performance_stats", "Viewed performance stats.", output.strip())
+
+IN_MODIFY, IN_ATTRIB, IN_CLOSE_WRITE = 0x2, 0x4, 0x8
+IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE = 0x40, 0x80, 0x100, 0x200
+IN_DELETE_SELF, IN_MOVE_SELF, IN_Q_OVERFLOW = 0x400, 0x800, 0x4000
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class DirectoryWatcher:
+    """Report which watched directories changed, through inotify via libc or by polling mtimes."""
+
+    def __init__(self, poll_interval=DAEMON_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self.paths = {}  # path -> inotify watch descriptor, or mtime when polling
+        self.fd = -1
+        try:
+            self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            self.fd = self.libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        except (OSError, AttributeError):
+            self.libc = None
+        self.backend = "inotify" if self.fd >= 0 else "polling"
+
+    def watch(self, paths):
+        """Make the watched set exactly `paths`, keeping existing watches."""
+        paths = {p for p in paths if os.path.isdir(p)}
+        for path in set(self.paths) - paths:
+            wd = self.paths.pop(path)
+            if self.backend == "inotify":
+                self.libc.inotify_rm_watch(self.fd, wd)
+        for path in paths - set(self.paths):
+            if self.backend == "inotify":
+                wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+                if wd >= 0:
+                    self.paths[path] = wd
+            else:
+                self.paths[path] = path_mtimes([path])[path]
+
+    def wait(self, timeout):
+        """Block up to `timeout` seconds and return the set of changed directories."""
+        if self.backend == "polling":
+            return self._poll(timeout)
+        changed = set()
+        by_wd = {wd: path for path, wd in self.paths.items()}
+        wait = timeout
+        while select.select([self.fd], [], [], wait)[0]:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+                offset += INOTIFY_EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    changed.update(self.paths)
+                elif wd in by_wd:
+                    changed.add(by_wd[wd])
+            wait = DAEMON_DEBOUNCE
+        return changed
+
+    def _poll(self, timeout):
+        deadline = time.time() + timeout
+        while True:
+            current = path_mtimes(self.paths)
+            changed = {path for path, mtime in current.items() if mtime != self.paths[path]}
+            if changed:
+                self.paths.update(current)
+                return changed
+            if time.time() >= deadline:
+                return set()
+            time.sleep(min(self.poll_interval, max(deadline - time.time(), 0)))
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class ConsoleDaemon:
+    """Holds interpreter inventory, per-interpreter packages and the log index in memory.
+
+    A watcher thread refreshes the parts affected by changes on PATH
+    directories, site-packages directories and the log store; queries are
+    answered from memory.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.log_store = SegmentLogStore(LOG_STORE_DIR)
+        self.watcher = DirectoryWatcher()
+        self.versions = []
+        self.interpreters = []
+        self.packages = {}  # interpreter path -> {normalized name: package} or None
+        self.site_dirs = {}  # interpreter path -> sys.path directories
+        self.logs_dirty = True
+        self.started = time.time()
+        self.refreshes = 0
+        self.queries = 0
+        self.running = True
+
+    def refresh_inventory(self):
+        versions = find_installed_python_versions()
+        interpreters = discover_interpreters()
+        paths = [path for _, path in interpreters]
+        with self.lock:
+            stale = [p for p in self.packages if p not in paths]
+            new = [p for p in paths if p not in self.packages]
+            self.versions, self.interpreters = versions, interpreters
+            for path in stale:
+                self.packages.pop(path, None)
+                self.site_dirs.pop(path, None)
+        self.refresh_packages(new)
+
+    def refresh_packages(self, paths):
+        if not paths:
+            return
+        with ThreadPoolExecutor(max_workers=min(PROBE_WORKERS, len(paths))) as pool:
+            packages = list(pool.map(get_installed_packages, paths))
+            graphs = list(pool.map(get_dependency_graph, paths))
+        with self.lock:
+            for path, found, graph in zip(paths, packages, graphs):
+                self.packages[path] = found
+                self.site_dirs[path] = [d for d in graph.environment["path"] if os.path.isdir(d)] if graph else []
+            self.refreshes += 1
+
+    def watched_paths(self):
+        with self.lock:
+            paths = {p for p in os.environ["PATH"].split(":") if p}
+            for dirs in self.site_dirs.values():
+                paths.update(dirs)
+        paths.add(str(LOG_STORE_DIR))
+        return paths
+
+    def watch_loop(self):
+        while self.running:
+            self.watcher.watch(self.watched_paths())
+            changed = self.watcher.wait(timeout=60)
+            if not changed:
+                continue
+            path_dirs = set(os.environ["PATH"].split(":"))
+            if str(LOG_STORE_DIR) in changed:
+                self.logs_dirty = True
+            if changed & path_dirs:
+                self.refresh_inventory()
+            with self.lock:
+                affected = [p for p, dirs in self.site_dirs.items() if changed.intersection(dirs)]
+            self.refresh_packages(affected)
+
+    def recent_logs(self, limit=20, action=None):
+        with self.lock:
+            if self.logs_dirty:
+                self.logs_dirty = False
+                self.log_store.reload()
+        return self.log_store.recent(int(limit), action)
+
+    def handle(self, request):
+        query = request.get("query")
+        handlers = {
+            "ping": lambda: "pong",
+            "status": self.status,
+            "versions": lambda path=None: self.for_path(path, self.versions),
+            "paths": lambda path=None: self.for_path(path, self.interpreters),
+            "packages": lambda python: self.packages.get(python),
+            "which": self.which,
+            "logs": self.recent_logs,
+            "log_actions": self.log_actions,
+        }
+        if query not in handlers:
+            return {"ok": False, "error": f"unknown query {query!r}"}
+        params = {k: v for k, v in request.items() if k != "query"}
+        with self.lock:
+            self.queries += 1
+        try:
+            return {"ok": True, "result": handlers[query](**params)}
+        except (TypeError, ValueError, KeyError) as e:
+            return {"ok": False, "error": str(e)}
+
+    @staticmethod
+    def for_path(path, answer):
+        """Answer an inventory query only for a client whose PATH matches the daemon's.
+
+        The inventory comes from the daemon's own PATH; a client with another
+        one (an activated venv, say) has to scan locally.
+        """
+        if path is not None and path != os.environ["PATH"]:
+            raise ValueError("the daemon's PATH differs from the client's")
+        return answer
+
+    def which(self, packages, path=None):
+        """Return, per interpreter, the requested packages that are installed (None if it could not be probed)."""
+        self.for_path(path, None)
+        if isinstance(packages, str):
+            packages = [packages]
+        result = []
+        with self.lock:
+            for name, path in self.interpreters:
+                installed = self.packages.get(path)
+                found = None if installed is None else {
+                    normalize_package_name(p): installed[normalize_package_name(p)]
+                    for p in packages if normalize_package_name(p) in installed
+                }
+                result.append({"name": name, "path": path, "packages": found})
+        return result
+
+    def log_actions(self):
+        with self.lock:
+            if self.logs_dirty:
+                self.logs_dirty = False
+                self.log_store.reload()
+        return self.log_store.actions()
+
+    def status(self):
+        with self.lock:
+            return {
+                "pid": os.getpid(),
+                "uptime": round(time.time() - self.started, 1),
+                "watcher": self.watcher.backend,
+                "watched_dirs": len(self.watcher.paths),
+                "interpreters": len(self.interpreters),
+                "refreshes": self.refreshes,
+                "queries": self.queries,
+            }
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    """One JSON request per line, one JSON response per line."""
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                response = {"ok": False, "error": "invalid JSON"}
+            else:
+                response = self.server.daemon.handle(request)
+            self.wfile.write((json.dumps(response) + "\n").encode())
+            self.wfile.flush()
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def daemon_request(query, socket_path=None, **params):
+    """Send a query to a running daemon; return its full response, or None if no daemon answers."""
+    socket_path = str(socket_path or DAEMON_SOCKET)
+    if not os.path.exists(socket_path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(DAEMON_CLIENT_TIMEOUT)
+            client.connect(socket_path)
+            client.sendall((json.dumps({"query": query, **params}) + "\n").encode())
+            response = b""
+            while not response.endswith(b"\n"):
+                chunk = client.recv(64 * 1024)
+                if not chunk:
+                    break
+                response += chunk
+        response = json.loads(response)
+    except (OSError, ValueError):
+        return None
+    return response
+
+def daemon_query(query, socket_path=None, **params):
+    """Send a query to a running daemon; return its result, or None if no daemon answers or it failed."""
+    response = daemon_request(query, socket_path, **params)
+    return response.get("result") if response and response.get("ok") else None
+
+def run_daemon(socket_path=None):
+    """Serve queries on a Unix socket until SIGTERM or Ctrl+C."""
+    socket_path = str(socket_path or DAEMON_SOCKET)
+    if daemon_query("ping", socket_path) == "pong":
+        print(Fore.RED + f"A daemon is already listening on {socket_path}.")
+        return
+    Path(socket_path).parent.mkdir(parents=True, exist_ok=True)
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)  # left behind by a daemon that did not exit cleanly
+
+    daemon = ConsoleDaemon()
+    start = time.time()
+    daemon.refresh_inventory()
+    print(Fore.GREEN + f"Warmed {len(daemon.interpreters)} interpreters in {time.time() - start:.2f}s "
+                       f"(watcher: {daemon.watcher.backend}).")
+    server = DaemonServer(socket_path, DaemonRequestHandler)
+    server.daemon = daemon
+    os.chmod(socket_path, 0o600)
+    threading.Thread(target=daemon.watch_loop, daemon=True).start()
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    log_action("daemon", f"Daemon started on {socket_path}")
+    LOG_STORE.close()  # no need to hold a segment open while idle
+    print(Fore.GREEN + f"Listening on {socket_path}")
     try:
-        subprocess.run(
-            [python_exec, "-m", "pip", "uninstall", "-y", library],
-            check=True
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.running = False
+        server.server_close()
+        daemon.watcher.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        log_action("daemon", f"Daemon on {socket_path} stopped", json.dumps(daemon.status()))
+        print(Fore.YELLOW + "Daemon stopped.")
+
+def parse_importtime(stderr):
+    """Parse -X importtime output into {module: {"self", "cumulative", "parent", "depth"}} (microseconds).
+
+    Children are printed before their parent, so nodes wait on a per-depth
+    stack until the parent one level up claims them.
+    """
+    modules = {}
+    pending = collections.defaultdict(list)
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        depth = (len(indent) - 1) // 2
+        for child in pending.pop(depth + 1, []):
+            modules[child]["parent"] = name
+        modules[name] = {"self": int(self_us), "cumulative": int(cumulative_us), "parent": None, "depth": depth}
+        pending[depth].append(name)
+    return modules
+
+def run_importtime(python_exec, modules, cold):
+    """One `-X importtime` run; cold runs point PYTHONPYCACHEPREFIX at an empty dir so nothing is cached."""
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    with tempfile.TemporaryDirectory(prefix="importtime-") as prefix:
+        if cold:
+            env["PYTHONPYCACHEPREFIX"] = prefix
+        start = time.perf_counter()
+        result = run_subprocess(
+            [python_exec, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+            capture_output=True, text=True, env=env, timeout=IMPORTTIME_TIMEOUT
         )
-        print(f"✅ {library}=={version} successfully uninstalled from Python {python_version}.")
-        log_action(logfile, f"Successfully uninstalled {library}=={version} for Python {python_version}")
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Uninstallation failed: {e}")
-        log_action(logfile, f"❌ Uninstallation failed for library: {library}=={version}, for Python {python_version}")
+        wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed")
+    return wall, parse_importtime(result.stderr)
+
+def aggregate_importtime(runs):
+    """Median self/cumulative time per module over several parsed runs, plus median wall time."""
+    walls = [wall for wall, _ in runs]
+    names = {}
+    for _, modules in runs:
+        for name, info in modules.items():
+            names.setdefault(name, {"parent": info["parent"], "depth": info["depth"], "self": [], "cumulative": []})
+            names[name]["self"].append(info["self"])
+            names[name]["cumulative"].append(info["cumulative"])
+    tree = {
+        name: {"parent": info["parent"], "depth": info["depth"],
+               "self": statistics.median(info["self"]), "cumulative": statistics.median(info["cumulative"])}
+        for name, info in names.items()
+    }
+    return {"runs": len(runs), "wall": statistics.median(walls) if walls else None, "modules": tree}
+
+def package_totals(tree):
+    """Sum self time by top-level package, answering which distributions cost the most."""
+    totals = collections.Counter()
+    for name, info in tree.items():
+        totals[name.split(".")[0]] += info["self"]
+    return totals
+
+def profile_interpreter(python_exec, modules, repeat):
+    """Cold runs with no bytecode cache, then a priming run and `repeat` warm runs."""
+    profile = {"python": python_exec, "version": probe_python_version(python_exec) or "unknown"}
+    try:
+        profile["cold"] = aggregate_importtime([run_importtime(python_exec, modules, True) for _ in range(repeat)])
+        run_importtime(python_exec, modules, False)
+        profile["warm"] = aggregate_importtime([run_importtime(python_exec, modules, False) for _ in range(repeat)])
+    except (RuntimeError, OSError, subprocess.TimeoutExpired) as e:
+        profile["error"] = str(e)
+    return profile
+
+def format_import_tree(tree, min_us=1000):
+    """Indented tree of modules whose cumulative time is at least min_us."""
+    children = collections.defaultdict(list)
+    for name, info in tree.items():
+        children[info["parent"]].append(name)
+    lines = []
+
+    def walk(name, depth):
+        info = tree[name]
+        if info["cumulative"] < min_us:
+            return
+        lines.append(f"{info['cumulative'] / 1000:9.1f} ms {info['self'] / 1000:8.1f} ms  {'  ' * depth}{name}")
+        for child in sorted(children[name], key=lambda c: -tree[c]["cumulative"]):
+            walk(child, depth + 1)
+
+    for root in sorted(children[None], key=lambda c: -tree[c]["cumulative"]):
+        walk(root, 0)
+    return lines
+
+def format_importtime_report(result, top=15):
+    lines = [f"Modules: {' '.join(result['modules'])}, {result['repeat']} runs each (medians)"]
+    for profile in result["profiles"]:
+        lines.append(f"\n=== {profile['python']} ({profile['version']}) ===")
+        if "error" in profile:
+            lines.append(f"  failed: {profile['error']}")
+            continue
+        for mode in ("cold", "warm"):
+            tree = profile[mode]["modules"]
+            lines.append(f"\n[{mode}] wall {profile[mode]['wall'] * 1000:.1f} ms")
+            lines.append(f"{'cumulative':>12} {'self':>11}  module")
+            lines += format_import_tree(tree)
+            slowest = sorted(tree.items(), key=lambda item: -item[1]["self"])[:top]
+            lines.append(f"\n[{mode}] slowest modules by self time:")
+            lines += [f"  {info['self'] / 1000:8.1f} ms  {name}" for name, info in slowest]
+            lines.append(f"[{mode}] slowest top-level packages:")
+            lines += [f"  {us / 1000:8.1f} ms  {name}" for name, us in package_totals(tree).most_common(top)]
+    lines += ["", *format_importtime_comparison(result["profiles"])]
+    return "\n".join(lines)
+
+def format_importtime_comparison(profiles, mode="warm", top=15):
+    """Side-by-side table of top-level package self time per interpreter."""
+    profiles = [p for p in profiles if mode in p]
+    if len(profiles) < 2:
+        return []
+    totals = [package_totals(p[mode]["modules"]) for p in profiles]
+    overall = collections.Counter()
+    for counter in totals:
+        overall.update(counter)
+    labels = [f"{p['version'].replace('Python ', '')}" for p in profiles]
+    lines = [f"Side by side ({mode}, ms):", f"{'package':<28}" + "".join(f"{label:>14}" for label in labels)]
+    lines.append(f"{'(wall)':<28}" + "".join(f"{p[mode]['wall'] * 1000:>14.1f}" for p in profiles))
+    for name, _ in overall.most_common(top):
+        lines.append(f"{name:<28}" + "".join(
+            f"{counter[name] / 1000:>14.1f}" if name in counter else f"{'-':>14}" for counter in totals))
+    lines.append("Columns: " + ", ".join(p["python"] for p in profiles))
+    return lines
+
+def profile_import_times():
+    modules = input(Fore.CYAN + "Module(s) to import (space separated, e.g. requests numpy): ").split()
+    if not modules or not all(re.fullmatch(r"[A-Za-z_][\w.]*", m) for m in modules):
+        print(Fore.RED + "Enter one or more importable module names.")
+        return
+    interpreters = discover_interpreters()
+    print(Fore.YELLOW + "\nKnown interpreters: " + ", ".join(name for name, _ in interpreters))
+    answer = input(Fore.CYAN + "Target versions or interpreter paths (space separated, or 'all'): ").strip()
+    targets = [path for _, path in interpreters] if answer == "all" else answer.split()
+    pythons = {}
+    for target in targets:
+        python_exec = resolve_python_executable(target)
+        if python_exec:
+            pythons.setdefault(interpreter_key(python_exec), python_exec)
+        else:
+            print(Fore.RED + f"Python {target} not found.")
+    if not pythons:
+        print(Fore.RED + "Nothing to profile.")
+        return
+    repeat = input(Fore.CYAN + "Runs per mode [5]: ").strip()
+    repeat = int(repeat) if repeat.isdigit() and int(repeat) > 0 else 5
+
+    # Interpreters run one after another so their timings do not disturb each other
+    profiles = []
+    for python_exec in pythons.values():
+        print(Fore.YELLOW + f"Profiling {python_exec}...")
+        profiles.append(profile_interpreter(python_exec, modules, repeat))
+    result = {"created": datetime.datetime.now().isoformat(timespec="seconds"),
+              "modules": modules, "repeat": repeat, "profiles": profiles}
+    IMPORTTIME_DIR.mkdir(parents=True, exist_ok=True)
+    path = IMPORTTIME_DIR / f"importtime_{datetime.datetime.now().strftime('%Y%m%d_%H_%M_%S')}.json"
+    save_json_cache(path, result)
+    report = format_importtime_report(result)
+    print(Fore.GREEN + report)
+    print(Fore.CYAN + f"\nSaved to {path}")
+    log_action("import_time_profile", f"Profiled import of {' '.join(modules)} on {len(profiles)} interpreter(s)", report)
+
+def stored_importtime_profiles():
+    return sorted(IMPORTTIME_DIR.glob("importtime_*.json")) if IMPORTTIME_DIR.exists() else []
+
+def list_import_profiles():
+    stored = stored_importtime_profiles()
+    if not stored:
+        print(Fore.YELLOW + "No stored import-time profiles.")
+    for number, path in enumerate(stored, start=1):
+        result = load_json_cache(path, {})
+        pythons = ", ".join(p["version"].replace("Python ", "") for p in result.get("profiles", []))
+        print(Fore.GREEN + f"{number}. {path.name}: {' '.join(result.get('modules', []))} on {pythons}")
+    return stored
+
+def compare_import_profiles():
+    stored = list_import_profiles()
+    if not stored:
+        return
+    picks = input(Fore.CYAN + "Profile numbers to compare (e.g. 1 3): ").split()
+    if not picks or not all(p.isdigit() and 1 <= int(p) <= len(stored) for p in picks):
+        print(Fore.RED + "Invalid profile number.")
+        return
+    results = [load_json_cache(stored[int(p) - 1], {}) for p in picks]
+    if len(results) == 1:
+        report = format_importtime_report(results[0])
+    else:
+        # Label each column with its run so repeated interpreters stay apart
+        profiles = []
+        for path_number, result in zip(picks, results):
+            for profile in result["profiles"]:
+                profiles.append(dict(profile, version=f"#{path_number} {profile['version']}"))
+        report = "\n".join(format_importtime_comparison(profiles, "warm") + [""]
+                           + format_importtime_comparison(profiles, "cold"))
+    print(Fore.GREEN + report)
+    log_action("import_time_profile", f"Compared stored import-time profiles {' '.join(picks)}", report)
+
+def import_time_menu():
+    while True:
+        print(Fore.YELLOW + """
+Import-time Profiler
+-------------------------------------------
+1. Profile imports across interpreters
+2. List stored profiles
+3. Compare stored profiles
+4. Back to main menu
+""")
+        choice = input(Fore.GREEN + "Enter your choice: ")
+        if choice == "1":
+            profile_import_times()
+        elif choice == "2":
+            list_import_profiles()
+        elif choice == "3":
+            compare_import_profiles()
+        elif choice == "4":
+            break
+        else:
+            print(Fore.RED + "Invalid choice. Please try again.")
 
 def python_package_menu():
-    version = input(Fore.CYAN + "\nEnter Python version (e.g., 3.9): ")
+    version = input(Fore.CYAN + "\nEnter Python version (e.g., 3.9), interpreter path, or 'env' to pick an environment: ").strip()
+    if version == "env":
+        version = choose_environment()
+        if not version:
+            return
     while True:
         print(Fore.YELLOW + f"""
 Python Package Manager for Python {version}
@@ -467,7 +4106,9 @@ Python Package Manager for Python {version}
 7. Uninstall a library
 8. Install a specific version of a library
 9. Uninstall a specific version of a library
-10. Back to main menu
+10. Refresh PyPI version cache
+11. Check dependency graph
+12. Back to main menu
 """)
         choice = input(Fore.GREEN + "Enter your choice: ")
         if choice == "1":
@@ -489,6 +4130,10 @@ Python Package Manager for Python {version}
         elif choice == "9":
             uninstall_library()
         elif choice == "10":
+            refresh_pypi_cache(version)
+        elif choice == "11":
+            check_dependencies(version)
+        elif choice == "12":
             break
         else:
             print(Fore.RED + "Invalid choice. Please try again.")
@@ -508,7 +4153,16 @@ def main_menu():
 ║ 7. List all log files                        ║
 ║ 8. Read a logfile                            ║
 ║ 9. Search in logs                            ║
-║ 10. Exit                                     ║
+║ 10. Apply a package manifest (batch)         ║
+║ 11. Background jobs                          ║
+║ 12. Environment snapshots                    ║
+║ 13. Performance stats                        ║
+║ 14. Compact and prune logs                   ║
+║ 15. Discover virtualenv/conda environments   ║
+║ 16. Install a library into many interpreters ║
+║ 17. Site-packages disk usage and dedup       ║
+║ 18. Import-time profiler                     ║
+║ 19. Exit                                     ║
 ╚══════════════════════════════════════════════╝
 """)
         choice = input(Fore.GREEN + "Enter your choice: ")
@@ -531,10 +4185,57 @@ def main_menu():
         elif choice == "9":
             search_in_logs()
         elif choice == "10":
+            apply_package_manifest()
+        elif choice == "11":
+            background_jobs_menu()
+        elif choice == "12":
+            snapshots_menu()
+        elif choice == "13":
+            show_performance_stats()
+        elif choice == "14":
+            compact_logs()
+        elif choice == "15":
+            list_environments()
+        elif choice == "16":
+            install_everywhere()
+        elif choice == "17":
+            disk_usage_menu()
+        elif choice == "18":
+            import_time_menu()
+        elif choice == "19":
+            active = JOB_SCHEDULER.active()
+            if active:
+                if not confirm(f"{len(active)} background jobs are still running. Cancel them and exit?"):
+                    continue
+                print(Fore.YELLOW + f"Stopping {len(active)} background jobs...")
+                JOB_SCHEDULER.shutdown()
             print(Fore.YELLOW + "Exiting. Goodbye!")
             break
         else:
             print(Fore.RED + "Invalid choice. Please try again.")
 
 if __name__ == "__main__":
-    main_menu()
+    parser = argparse.ArgumentParser(description="Python Version and Module Tool")
+    parser.add_argument("--daemon", action="store_true",
+                        help="keep inventory, package metadata and the log index warm and serve queries")
+    parser.add_argument("--socket", help=f"Unix socket path (default {DAEMON_SOCKET})")
+    parser.add_argument("--query", nargs="+", metavar=("QUERY", "KEY=VALUE"),
+                        help="send a query to a running daemon, e.g. --query which packages=requests")
+    args = parser.parse_args()
+    if args.daemon:
+        run_daemon(args.socket)
+    elif args.query:
+        malformed = [item for item in args.query[1:] if "=" not in item]
+        if malformed:
+            parser.error(f"--query parameters must be KEY=VALUE, got: {' '.join(malformed)}")
+        params = dict(item.split("=", 1) for item in args.query[1:])
+        if "packages" in params:
+            params["packages"] = params["packages"].split(",")
+        response = daemon_request(args.query[0], args.socket, **params)
+        if response is None:
+            sys.exit(f"No answer from a daemon on {args.socket or DAEMON_SOCKET}.")
+        if not response.get("ok"):
+            sys.exit(f"Daemon error: {response.get('error', 'unknown error')}")
+        print(json.dumps(response.get("result"), indent=2))
+    else:
+        main_menu()
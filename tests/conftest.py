@@ -0,0 +1,27 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import python_linux_management_console as console
+
+
+@pytest.fixture
+def quiet_log(monkeypatch):
+    """Collect log_action calls instead of writing to the shared log store."""
+    logged = []
+    monkeypatch.setattr(console, "log_action", lambda log_name, message, *a, **kw: logged.append(message))
+    return logged
+
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    """Point the log directory, archives and the segment log store at a temporary directory."""
+    monkeypatch.setattr(console, "LOG_DIR", tmp_path)
+    monkeypatch.setattr(console, "ARCHIVE_DIR", tmp_path / "archives")
+    monkeypatch.setattr(console, "ARCHIVE_MANIFEST", tmp_path / "archives" / "manifest.json")
+    store = console.SegmentLogStore(tmp_path / "segments")
+    monkeypatch.setattr(console, "LOG_STORE", store)
+    yield tmp_path
+    store.close()
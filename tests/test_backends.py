@@ -0,0 +1,27 @@
+import pytest
+
+import python_linux_management_console as console
+
+
+def test_backend_commands_are_abstract():
+    with pytest.raises(TypeError):
+        console.PackageManagerBackend()
+
+
+def test_install_refreshes_once_for_several_versions():
+    backend = console.FakeBackend(metadata_age=None)
+    result = backend.install(["3.10", "3.11", "3.12"])
+    assert result.returncode == 0
+    assert backend.commands == [
+        "echo fake refresh",
+        "echo fake install python3.10 python3.11 python3.12",
+    ]
+
+
+def test_install_skips_refresh_when_metadata_is_fresh():
+    backend = console.FakeBackend(metadata_age=0)
+    backend.install(["3.10", "3.11", "3.12"])
+    assert backend.commands == ["echo fake install python3.10 python3.11 python3.12"]
+    stale = console.FakeBackend(metadata_age=console.PACKAGE_METADATA_MAX_AGE + 1)
+    stale.install(["3.12"])
+    assert stale.commands[0] == "echo fake refresh"
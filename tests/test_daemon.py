@@ -0,0 +1,35 @@
+import os
+
+import pytest
+
+import python_linux_management_console as console
+
+
+@pytest.fixture
+def daemon(log_dir):
+    daemon = console.ConsoleDaemon()
+    daemon.versions = [("Python 3.11.7", "/usr/bin/python3.11")]
+    daemon.interpreters = [("3.11", "/usr/bin/python3.11")]
+    daemon.packages = {"/usr/bin/python3.11": {"six": {"name": "six", "version": "1.16.0"}}}
+    return daemon
+
+
+def test_inventory_answers_a_client_with_the_same_path(daemon):
+    response = daemon.handle({"query": "versions", "path": os.environ["PATH"]})
+    assert response == {"ok": True, "result": daemon.versions}
+    response = daemon.handle({"query": "which", "packages": ["six", "requests"], "path": os.environ["PATH"]})
+    assert response["result"][0]["packages"] == {"six": {"name": "six", "version": "1.16.0"}}
+
+
+@pytest.mark.parametrize("query", ["versions", "paths", "which"])
+def test_inventory_refuses_a_client_with_another_path(daemon, query):
+    request = {"query": query, "path": "/opt/venv/bin:" + os.environ["PATH"]}
+    if query == "which":
+        request["packages"] = ["six"]
+    response = daemon.handle(request)
+    assert not response["ok"]
+    assert "PATH" in response["error"]
+
+
+def test_unknown_query_reports_an_error(daemon):
+    assert daemon.handle({"query": "bogus"}) == {"ok": False, "error": "unknown query 'bogus'"}
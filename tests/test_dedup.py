@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+import python_linux_management_console as console
+
+
+@pytest.fixture
+def trees(tmp_path, monkeypatch):
+    """Two site-packages-like trees holding the same file."""
+    monkeypatch.setattr(console, "DEDUP_DIR", tmp_path / "dedup")
+    monkeypatch.setattr(console, "FILE_HASH_CACHE", tmp_path / "file_hashes.json")
+    content = b"x = 1\n" * 2000
+    roots = []
+    for name in ("a", "b"):
+        root = tmp_path / name
+        root.mkdir()
+        (root / "f.py").write_bytes(content)
+        roots.append(str(root))
+    return roots, content
+
+
+def scan(roots):
+    scanned = console.scan_trees(roots)
+    return console.find_duplicate_files([f for files in scanned.values() for f in files])
+
+
+def test_dedup_links_and_undo_restores(trees):
+    roots, content = trees
+    duplicates = scan(roots)
+    assert len(duplicates) == 1
+    manifest_path, linked = console.dedup_with_hardlinks(duplicates)
+    assert len(linked) == 1
+    a, b = (os.path.join(root, "f.py") for root in roots)
+    assert os.path.samefile(a, b)
+
+    restored, skipped = console.undo_dedup(manifest_path)
+    assert (restored, skipped) == (1, 0)
+    assert not os.path.samefile(a, b)
+    assert open(a, "rb").read() == open(b, "rb").read() == content
+
+
+def test_dedup_skips_group_when_keeper_changed(trees):
+    roots, content = trees
+    duplicates = scan(roots)
+    keeper = duplicates[0][2][0][0]
+    other = next(f[0] for f in duplicates[0][2][1:])
+    replacement = keeper + ".new"
+    with open(replacement, "wb") as f:
+        f.write(b"y = 2\n" * 2000)
+    os.replace(replacement, keeper)  # e.g. a pip upgrade after the scan
+
+    _, linked = console.dedup_with_hardlinks(duplicates)
+    assert linked == []
+    assert open(other, "rb").read() == content
+
+
+def test_dedup_skips_files_with_another_mode(trees):
+    roots, _ = trees
+    duplicates = scan(roots)
+    other = next(f[0] for f in duplicates[0][2][1:])
+    os.chmod(other, 0o600)
+    _, linked = console.dedup_with_hardlinks(duplicates)
+    assert linked == []
@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+import python_linux_management_console as console
+
+
+@pytest.fixture
+def scheduler(log_dir, monkeypatch):
+    monkeypatch.setattr(console, "JOB_CANCEL_GRACE", 0.5)
+    return console.JobScheduler()
+
+
+def wait_for(predicate, timeout=10):
+    deadline = time.time() + timeout
+    while not predicate():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.05)
+
+
+def process_alive(pid):
+    """True unless the process is gone or only left as a zombie for init to reap."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def test_jobs_sharing_a_lock_key_run_one_at_a_time(scheduler):
+    first = scheduler.submit("first", "sleep 0.3; echo first", "key", "test_jobs")
+    second = scheduler.submit("second", "echo second", "key", "test_jobs")
+    other = scheduler.submit("other", "echo other", "other-key", "test_jobs")
+    wait_for(lambda: other.status == "done")
+    assert second.status == "queued"
+    wait_for(lambda: second.status == "done")
+    assert first.status == "done"
+    assert second.output_tail() == "second"
+
+
+def test_shutdown_stops_whole_process_groups(scheduler, tmp_path):
+    pid_file = tmp_path / "child.pid"
+    # The child ignores SIGTERM, so it only goes away with the SIGKILL after the grace period
+    command = f"sh -c 'trap \"\" TERM; echo $$ > {pid_file}; sleep 30' & wait"
+    job = scheduler.submit("stubborn", command, "key", "test_jobs")
+    queued = scheduler.submit("queued", "echo never", "key", "test_jobs")
+    wait_for(lambda: pid_file.exists() and pid_file.read_text().strip())
+    child = int(pid_file.read_text())
+
+    stopped = scheduler.shutdown()
+    assert {j.id for j in stopped} == {job.id, queued.id}
+    assert job.status == "cancelled" and queued.status == "cancelled"
+    assert job.result is not None
+    assert not process_alive(child)
+    assert scheduler.active() == []
@@ -0,0 +1,61 @@
+import datetime
+
+import python_linux_management_console as console
+
+
+def legacy_log(directory, action, when, content="output\n"):
+    path = directory / f"{action}_{when.strftime('%Y%m%d_%H_%M_%S')}.log"
+    path.write_text(content)
+    return path
+
+
+def test_compaction_archives_old_legacy_logs(log_dir):
+    old = datetime.datetime.now() - datetime.timedelta(days=40)
+    first = legacy_log(log_dir, "install_module", old, "installed requests\n")
+    second = legacy_log(log_dir, "install_module", old + datetime.timedelta(minutes=1))
+    recent = legacy_log(log_dir, "install_module", datetime.datetime.now())
+
+    assert console.compact_legacy_logs("month", min_age_days=1) == 2
+    assert not first.exists() and not second.exists() and recent.exists()
+    manifest = console.load_json_cache(console.ARCHIVE_MANIFEST, {})
+    entries = [e["file"] for info in manifest["archives"].values() for e in info["entries"]]
+    assert sorted(entries) == sorted([first.name, second.name])
+
+    matches = list(console.search_logs("installed requests"))
+    assert [m["text"] for m in matches] == ["installed requests"]
+    assert first.name in matches[0]["file"]
+
+
+def test_retention_removes_old_archives_and_legacy_logs(log_dir):
+    old = datetime.datetime.now() - datetime.timedelta(days=40)
+    legacy_log(log_dir, "install_module", old)
+    console.compact_legacy_logs("month", min_age_days=1)
+    stale = legacy_log(log_dir, "uninstall_module", old)
+    recent = legacy_log(log_dir, "uninstall_module", datetime.datetime.now())
+
+    removed = console.apply_log_retention(max_age_days=30)
+    assert stale in removed
+    assert not stale.exists() and recent.exists()
+    assert not list(console.ARCHIVE_DIR.glob("*.gz"))
+    assert console.load_json_cache(console.ARCHIVE_MANIFEST, {})["archives"] == {}
+
+
+def test_retention_keeps_logs_without_a_timestamp(log_dir):
+    notes = log_dir / "notes.log"
+    notes.write_text("kept by hand\n")
+    assert console.apply_log_retention(max_age_days=30) == []
+    assert console.apply_log_retention(max_bytes=0) == []
+    assert notes.exists()
+
+
+def test_retention_by_size_keeps_the_current_segment(log_dir):
+    store = console.LOG_STORE
+    store.max_bytes = 200
+    for i in range(10):
+        store.append({"timestamp": f"2024-01-01 00:00:{i:02d}", "action": "test", "message": "x" * 50})
+    current = store.store_dir / store.index["current"]
+
+    removed = console.apply_log_retention(max_bytes=0)
+    assert removed and current not in removed
+    assert current.exists()
+    assert all(not path.exists() for path in removed)
@@ -0,0 +1,49 @@
+import pytest
+
+import python_linux_management_console as console
+
+
+@pytest.mark.parametrize("regex, safe", [
+    ("requests", True),
+    ("pip install", True),
+    ("café", True),
+    ("a.b", False),
+    (r"\d+ files", False),
+    ('"quoted"', False),
+    ("tab\there", False),
+    ("(six|numpy)", False),
+])
+def test_raw_prefilter_only_for_literals(regex, safe):
+    assert console.raw_prefilter_safe(regex) is safe
+
+
+@pytest.fixture
+def records(log_dir):
+    for i, (message, output) in enumerate([
+        ("Installed requests", "Successfully installed requests-2.31.0"),
+        ('Ran "pip list"', "Package    Version\nsix        1.16.0"),
+        ("Removed café", "C:\\temp\tdone"),
+    ]):
+        console.LOG_STORE.append({"timestamp": f"2024-01-0{i + 1} 10:00:00", "action": f"action{i}",
+                                  "message": message, "output": output})
+    return log_dir
+
+
+@pytest.mark.parametrize("regex, expected", [
+    ("requests-2", ["Successfully installed requests-2.31.0"]),
+    ('"pip list"', ['Ran "pip list"']),
+    (r"six\s+1\.16", ["six        1.16.0"]),
+    (r"temp\tdone", ["C:\\temp\tdone"]),
+    ("café", ["Removed café"]),
+])
+def test_search_matches_decoded_records(records, regex, expected):
+    texts = [m["text"] for m in console.search_logs(regex)]
+    assert len(texts) == len(expected)
+    assert all(text.endswith(line) for text, line in zip(texts, expected))
+
+
+def test_search_filters_by_action_and_date(records):
+    assert list(console.search_logs("pip", action="action1"))
+    assert list(console.search_logs("requests", action="action1")) == []
+    assert list(console.search_logs("requests", since="2024-01-02 00:00:00")) == []
+    assert len(list(console.search_logs("e", limit=2))) == 2
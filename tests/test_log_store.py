@@ -0,0 +1,41 @@
+import json
+
+import python_linux_management_console as console
+
+
+def make_record(i):
+    return {"timestamp": f"2024-01-01 00:00:{i:02d}", "action": "test", "message": f"record {i}"}
+
+
+def test_log_store_rotates_segments(tmp_path):
+    store = console.SegmentLogStore(tmp_path, max_bytes=300)
+    for i in range(20):
+        store.append(make_record(i))
+    store.close()
+
+    segments = sorted(tmp_path.glob("segment_*.jsonl"))
+    assert len(segments) > 1
+    assert all(path.stat().st_size <= 300 for path in segments)
+
+    reopened = console.SegmentLogStore(tmp_path, max_bytes=300)
+    assert [r["message"] for r in reopened.records()] == [f"record {i}" for i in range(20)]
+    assert reopened.actions()["test"]["count"] == 20
+
+
+def test_log_store_recovers_torn_tail(tmp_path):
+    store = console.SegmentLogStore(tmp_path)
+    store.append(make_record(1))
+    store.close()
+    segment = next(tmp_path.glob("segment_*.jsonl"))
+    with open(segment, "ab") as f:
+        f.write(b'{"timestamp": "2024-01-01 00:00:02", "act')  # writer died mid-line
+
+    other = console.SegmentLogStore(tmp_path)
+    other.append(make_record(3))
+    other.close()
+
+    lines = segment.read_bytes().splitlines()
+    assert json.loads(lines[-1])["message"] == "record 3"
+    reopened = console.SegmentLogStore(tmp_path)
+    assert [r["message"] for r in reopened.recent(10)] == ["record 1", "record 3"]
+    assert reopened.actions()["test"]["count"] == 2
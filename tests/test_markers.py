@@ -0,0 +1,42 @@
+import pytest
+
+import python_linux_management_console as console
+
+
+@pytest.mark.parametrize("version, operator, wanted, expected", [
+    ("1.0", "==", "1.0.0", True),
+    ("1.10", ">", "1.9", True),
+    ("2.0", "<", "1.9", False),
+    ("1.4.2", "~=", "1.4", True),
+    ("2.0", "~=", "1.4", False),
+    ("3.11.4", "==", "3.11.*", True),
+    ("3.12.0", "!=", "3.11.*", True),
+    ("1.0", "===", "1.0.0", False),
+])
+def test_version_matches(version, operator, wanted, expected):
+    assert console.version_matches(version, operator, wanted) is expected
+
+
+ENVIRONMENT = {
+    "python_version": "3.11",
+    "python_full_version": "3.11.4",
+    "sys_platform": "linux",
+    "platform_system": "Linux",
+    "implementation_name": "cpython",
+    "platform_python_implementation": "CPython",
+}
+
+
+@pytest.mark.parametrize("marker, expected", [
+    ('python_version >= "3.8"', True),
+    ('python_version < "3.10"', False),
+    ('sys_platform == "win32" or python_version >= "3.11"', True),
+    ('(sys_platform == "win32" or sys_platform == "linux") and python_version < "3.9"', False),
+    ('python_version >= "3.8" and (platform_system == "Windows" or implementation_name == "cpython")', True),
+    ('platform_python_implementation != "CPython"', False),
+    ('extra == "test"', False),
+    ('python_version >= "3.8" and extra == "test"', False),
+    ('"linux" in sys_platform', True),
+])
+def test_marker_applies(marker, expected):
+    assert console.marker_applies(marker, ENVIRONMENT) is expected
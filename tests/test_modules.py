@@ -0,0 +1,41 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import python_linux_management_console as console
+
+
+@pytest.fixture
+def venv(tmp_path, monkeypatch):
+    """A venv holding one module the base interpreter does not have."""
+    monkeypatch.setattr(console, "MODULE_CACHE", tmp_path / "module_inventory.json")
+    env = tmp_path / "env"
+    subprocess.run([sys.executable, "-m", "venv", "--without-pip", str(env)], check=True)
+    python = env / "bin" / "python"
+    site = subprocess.run([str(python), "-c", "import sysconfig; print(sysconfig.get_path('purelib'))"],
+                          capture_output=True, text=True, check=True).stdout.strip()
+    Path(site, "only_in_venv_probe.py").write_text("")
+    return str(python)
+
+
+def names(modules):
+    return {m["name"] for m in modules}
+
+
+def test_venv_modules_come_from_the_venv(venv):
+    base = sys.executable
+    venv_modules = console.get_installed_modules(venv)
+    assert "only_in_venv_probe" in names(venv_modules)
+    assert "only_in_venv_probe" not in names(console.get_installed_modules(base))
+    # The base entry must not replace the venv's cached one
+    assert "only_in_venv_probe" in names(console.get_installed_modules(venv))
+
+
+def test_module_cache_sees_new_site_packages_entries(venv):
+    assert "another_probe" not in names(console.get_installed_modules(venv))
+    site = Path(subprocess.run([venv, "-c", "import sysconfig; print(sysconfig.get_path('purelib'))"],
+                               capture_output=True, text=True, check=True).stdout.strip())
+    (site / "another_probe.py").write_text("")
+    assert "another_probe" in names(console.get_installed_modules(venv))
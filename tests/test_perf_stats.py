@@ -0,0 +1,18 @@
+import pytest
+
+import python_linux_management_console as console
+
+
+@pytest.mark.parametrize("command, kind", [
+    (console.AptBackend().install_shell_command(["3.12"]), "apt"),
+    (console.DnfBackend().install_shell_command(["3.12"]), "dnf"),
+    ("sudo apt install -y python3.12", "apt"),
+    ("sudo -n -u root dnf install -y python3.12", "dnf"),
+    ("sudo --user=root -- yum install -y python3.12", "yum"),
+    (["python3.11", "-m", "pip", "install", "six"], "pip_install"),
+    ("/usr/bin/python3.11 --version", "version_probe"),
+    (["/usr/bin/git", "status"], "git"),
+    ("", "other"),
+])
+def test_classify_command(command, kind):
+    assert console.classify_command(command) == kind
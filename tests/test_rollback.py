@@ -0,0 +1,27 @@
+import python_linux_management_console as console
+
+
+def test_rollback_refuses_unknown_starting_state(monkeypatch, quiet_log):
+    commands = []
+    monkeypatch.setattr(console, "get_installed_packages", lambda python_exec: {})
+    monkeypatch.setattr(console, "run_command", lambda command, *a, **kw: commands.append(command))
+    assert console.rollback_packages("python3", None) is False
+    assert commands == []
+    assert quiet_log
+
+
+def test_rollback_refuses_unknown_current_state(monkeypatch, quiet_log):
+    commands = []
+    monkeypatch.setattr(console, "get_installed_packages", lambda python_exec: None)
+    monkeypatch.setattr(console, "run_command", lambda command, *a, **kw: commands.append(command))
+    assert console.rollback_packages("python3", {"six": "1.16.0"}) is False
+    assert commands == []
+
+
+def test_apply_operations_skips_when_probe_fails(monkeypatch, quiet_log):
+    commands = []
+    monkeypatch.setattr(console, "get_installed_packages", lambda python_exec: None)
+    monkeypatch.setattr(console, "run_command", lambda command, *a, **kw: commands.append(command))
+    report = console.apply_package_operations("python3", ["six"], ["requests"])
+    assert report["status"] == "skipped (package probe failed)"
+    assert commands == []
@@ -0,0 +1,73 @@
+import pytest
+
+import python_linux_management_console as console
+
+
+def package(name, version, direct_url=None):
+    return {"name": name, "version": version, "direct_url": direct_url}
+
+
+@pytest.mark.parametrize("direct_url, expected", [
+    (None, "six==1.16.0"),
+    ({"url": "file:///src/six", "dir_info": {"editable": True}},
+     "-e /src/six  # six==1.16.0"),
+    ({"url": "file:///src/six", "dir_info": {}},
+     "six @ file:///src/six  # six==1.16.0"),
+    ({"url": "https://example.com/six.whl", "archive_info": {"hash": "sha256=abc"}},
+     "six @ https://example.com/six.whl#sha256=abc  # six==1.16.0"),
+    ({"url": "https://github.com/x/six", "vcs_info": {"vcs": "git", "commit_id": "deadbeef"},
+      "subdirectory": "src"},
+     "six @ git+https://github.com/x/six@deadbeef#subdirectory=src  # six==1.16.0"),
+])
+def test_requirement_line_keeps_the_install_source(direct_url, expected):
+    assert console.requirement_line(package("six", "1.16.0", direct_url)) == expected
+
+
+@pytest.mark.parametrize("version_output, excluded", [
+    ("Python 3.11.7", {"pip", "setuptools", "wheel", "distribute"}),
+    ("Python 3.12.1", {"pip"}),
+    ("Python 3.13.0", {"pip"}),
+    (None, {"pip", "setuptools", "wheel", "distribute"}),
+])
+def test_freeze_excludes_follow_the_python_version(version_output, excluded):
+    assert console.freeze_excludes(version_output) == excluded
+
+
+@pytest.fixture
+def snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(console, "SNAPSHOT_DIR", tmp_path / "snapshots")
+    monkeypatch.setattr(console, "SNAPSHOT_INDEX", tmp_path / "snapshots" / "index.json")
+    packages = {
+        "pip": package("pip", "24.0"),
+        "setuptools": package("setuptools", "69.0.0"),
+        "six": package("six", "1.16.0"),
+        "mytool": package("mytool", "0.1", {"url": "file:///src/mytool", "dir_info": {"editable": True}}),
+    }
+    monkeypatch.setattr(console, "get_installed_packages", lambda python_exec: packages)
+    monkeypatch.setattr(console, "probe_python_version", lambda python_exec: "Python 3.12.1")
+    digest, is_new = console.take_snapshot("python3")
+    assert is_new
+    return digest
+
+
+def test_snapshot_round_trip_and_export(snapshot, tmp_path):
+    digest, packages = console.load_snapshot(snapshot[:8])
+    assert digest == snapshot
+    assert packages["mytool"][:2] == ("mytool", "0.1")
+    assert console.snapshot_python_version(digest) == "Python 3.12.1"
+
+    output = tmp_path / "requirements.txt"
+    console.export_snapshot(packages, output, console.snapshot_python_version(digest))
+    assert output.read_text().splitlines() == [
+        "-e /src/mytool  # mytool==0.1",
+        "setuptools==69.0.0",
+        "six==1.16.0",
+    ]
+
+
+def test_snapshot_diff_reports_source_changes():
+    old = {"six": ("six", "1.16.0", "six==1.16.0"), "pip": ("pip", "23.0", "pip==23.0")}
+    new = {"six": ("six", "1.16.0", "six @ file:///src/six  # six==1.16.0"), "pip": ("pip", "24.0", "pip==24.0")}
+    added, removed, changed = console.diff_snapshots(old, new)
+    assert (added, removed) == ([], [])
+    assert changed == ["pip: 23.0 -> 24.0", "six: six==1.16.0 -> six @ file:///src/six  # six==1.16.0"]
@@ -0,0 +1,43 @@
+import os
+import sys
+
+import pytest
+
+import python_linux_management_console as console
+
+
+@pytest.fixture
+def fetches(tmp_path, monkeypatch):
+    """Record pip index lookups; the index has 1.16.0 until 1.17.0 is 'published'."""
+    monkeypatch.setattr(console, "PYPI_INDEX_CACHE", tmp_path / "pypi_versions.json")
+    monkeypatch.setattr(console, "LOCAL_PACKAGE_INDEX", None)
+    published = ["1.16.0"]
+    calls = []
+
+    def fetch(python_exec, package):
+        calls.append((python_exec, package))
+        return list(published), None
+
+    monkeypatch.setattr(console, "fetch_pip_versions", fetch)
+    return calls, published
+
+
+def test_interpreter_spellings_share_one_entry(fetches, monkeypatch):
+    calls, _ = fetches
+    full = sys.executable
+    monkeypatch.setenv("PATH", os.path.dirname(full) + os.pathsep + os.environ["PATH"])
+    short = os.path.basename(full)
+    assert console.get_available_versions(short, "six") == (["1.16.0"], None)
+    assert console.get_available_versions(full, "six") == (["1.16.0"], None)
+    assert len(calls) == 1
+
+
+def test_missing_version_refreshes_once(fetches):
+    calls, published = fetches
+    assert console.is_library_version_on_pypi(sys.executable, "six", "1.16.0")
+    published.insert(0, "1.17.0")
+    assert console.is_library_version_on_pypi(sys.executable, "six", "1.17.0")
+    assert len(calls) == 2
+    assert console.is_library_version_on_pypi(sys.executable, "six", "1.17.0")
+    assert not console.is_library_version_on_pypi(sys.executable, "six", "9.9")
+    assert len(calls) == 3